@@ -14,20 +14,98 @@ W(t) = w_time(t) × S(t) × C(t) × I × U × M(t)
 """
 
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional, List, Tuple
+from typing import Dict, Any, Optional, List, Tuple, Deque, Iterable, Union
 from dataclasses import dataclass
+from collections import Counter, deque
 from enum import Enum
+import bisect
 import logging
 import math
 
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:  # numba为可选依赖，缺失时退回NumPy实现
+    njit = None
+
 from complete_memory_system import (
     Memory, MemoryMetadata, MemoryFactors, MultimodalContent,
-    MemoryLevel, MemoryCategory, Modality, MemoryStore
+    MemoryLevel, MemoryCategory, Modality, QueryMode, MemoryStore,
+    normalize_mentions, RECENT_MENTIONS_MAXLEN
 )
 
 logger = logging.getLogger(__name__)
 
 
+# 动量因子查找表：MOMENTUM_LUT[n] = 1 + 0.3 × (1 - exp(-0.5n))
+# 近期提及最多 RECENT_MENTIONS_MAXLEN 条，n 的取值范围有限，直接查表
+MOMENTUM_LUT = np.array(
+    [1.0 + 0.3 * -math.expm1(-0.5 * n) for n in range(RECENT_MENTIONS_MAXLEN + 1)],
+    dtype=np.float64
+)
+MOMENTUM_LUT_MAX = RECENT_MENTIONS_MAXLEN
+_MOMENTUM_TABLE = tuple(MOMENTUM_LUT.tolist())
+
+
+# ============================================================================
+# 批量权重内核（Numba）
+# ============================================================================
+
+if njit is not None:
+    # 不启用 nnan：缺失时间戳以NaN表示，需要保留isnan判断
+    @njit(parallel=True, fastmath={"nsz", "arcp", "contract", "afn", "reassoc"}, cache=True)
+    def _compute_weights_kernel(
+        last_activated_ts, last_mention_ts, correction_ts,
+        is_negated, is_corrected, category,
+        mention_ts, mention_offsets,
+        alpha_eff_lut, importance_lut, momentum_lut, user_factor,
+        now_ts, inv_scale, window_start,
+        semantic_horizon, conflict_horizon,
+        out_w_time, out_semantic, out_conflict, out_importance,
+        out_user, out_momentum, out_total
+    ):
+        """单次遍历计算全部六个因子，不产生中间数组"""
+        for i in prange(category.shape[0]):
+            cat = category[i]
+            
+            t_days = (now_ts - last_activated_ts[i]) * inv_scale
+            w_time = 1.0 / (1.0 + alpha_eff_lut[cat] * t_days)
+            
+            s = 1.0
+            if not np.isnan(last_mention_ts[i]):
+                mention_days = (now_ts - last_mention_ts[i]) * inv_scale
+                if mention_days < semantic_horizon:
+                    s = 1.0 + 0.5 * math.exp(-0.05 * mention_days)
+            
+            c = 1.0
+            if is_negated[i] or is_corrected[i]:
+                c = 0.3
+                if not np.isnan(correction_ts[i]):
+                    correction_days = (now_ts - correction_ts[i]) * inv_scale
+                    if correction_days < conflict_horizon:
+                        c = 0.3 + 0.7 * math.exp(-0.01 * correction_days)
+            
+            n = 0
+            for j in range(mention_offsets[i], mention_offsets[i + 1]):
+                if mention_ts[j] >= window_start:
+                    n += 1
+            m = momentum_lut[min(n, momentum_lut.shape[0] - 1)]
+            
+            importance = importance_lut[cat]
+            total = w_time * s * c * importance * user_factor * m
+            
+            out_w_time[i] = w_time
+            out_semantic[i] = s
+            out_conflict[i] = c
+            out_importance[i] = importance
+            out_user[i] = user_factor
+            out_momentum[i] = m
+            out_total[i] = min(2.0, max(0.01, total))
+else:
+    _compute_weights_kernel = None
+
+
 # ============================================================================
 # 3. 记忆衰退曲线引擎
 # ============================================================================
@@ -44,31 +122,36 @@ class UpdateTrigger(Enum):
     MANUAL_DELETE = "manual_delete"         # 用户删除
 
 
-class QueryMode(Enum):
-    """查询模式"""
-    NORMAL = "normal"       # 普通模式：优先FULL/SUMMARY
-    REVIEW = "review"       # 回顾模式：允许TRACE/ARCHIVE上浮
-    DEBUG = "debug"         # 调试模式：显示所有层级
-
-
 class CompleteMemoryEngine:
     """完整记忆引擎"""
     
+    # 指数项低于该值视为已饱和（S→1.0, C→0.3），不再调用exp
+    EXP_SATURATION = 1e-9
+    
+    # 批量结果的列名（与 MemoryFactors 字段一致）
+    FACTOR_COLUMNS = (
+        "time_weight", "semantic_boost", "conflict_penalty",
+        "importance", "user_factor", "momentum", "total_weight"
+    )
+    
     def __init__(
         self,
         user_factor: float = 1.0,
         time_scale: int = 86400,  # 1天=86400秒
-        enable_scheduler: bool = True
+        enable_scheduler: bool = True,
+        log_verbosity: int = 2
     ):
         """
         Args:
             user_factor: 用户个性化因子 U (0.7=慢遗忘, 1.5=快遗忘)
             time_scale: 时间刻度（秒）
             enable_scheduler: 是否启用定时调度
+            log_verbosity: 权重日志详细程度（0=不记录, 1=仅权重, 2=含因子明细）
         """
-        self.user_factor = user_factor
+        self._user_factor = user_factor
         self.time_scale = time_scale
         self.enable_scheduler = enable_scheduler
+        self.log_verbosity = log_verbosity
         
         # 类别重要性 I
         self.category_importance = {
@@ -92,6 +175,16 @@ class CompleteMemoryEngine:
             MemoryCategory.TEMPORARY: 0.015         # 快速衰减
         }
         
+        # 按 MemoryCategory.idx 排列的查找表：标量路径用tuple，批量路径用ndarray
+        self._importance_table = tuple(
+            self.category_importance.get(c, 1.0) for c in MemoryCategory
+        )
+        self._alpha_table = tuple(
+            self.category_decay_alpha.get(c, 0.01) for c in MemoryCategory
+        )
+        self._importance_lut = np.array(self._importance_table, dtype=np.float64)
+        self._rebuild_alpha_effective()
+        
         # 层级权重阈值
         self.level_thresholds = {
             MemoryLevel.FULL: (0.6, float('inf')),
@@ -101,9 +194,39 @@ class CompleteMemoryEngine:
             MemoryLevel.ARCHIVE: (0.0, 0.05)
         }
         
+        # 按下界升序排列的阈值（区间首尾相接，二分查找定位层级）
+        sorted_thresholds = sorted(
+            self.level_thresholds.items(), key=lambda item: item[1][0]
+        )
+        self._level_bounds = tuple(min_w for _, (min_w, _) in sorted_thresholds)
+        self._levels_by_bound = tuple(level for level, _ in sorted_thresholds)
+        self._level_bounds_arr = np.array(self._level_bounds, dtype=np.float64)
+        self._level_idx_by_bound = np.array(
+            [level.idx for level in self._levels_by_bound], dtype=np.int8
+        )
+        
         # 频繁强化阈值
         self.frequent_window_hours = 24
         self.frequent_threshold = 3
+        
+        # S(t)/C(t) 指数项的饱和时刻（天）
+        self._semantic_horizon_days = -math.log(self.EXP_SATURATION) / 0.05
+        self._conflict_horizon_days = -math.log(self.EXP_SATURATION) / 0.01
+    
+    @property
+    def user_factor(self) -> float:
+        """用户个性化因子 U"""
+        return self._user_factor
+    
+    @user_factor.setter
+    def user_factor(self, value: float):
+        self._user_factor = value
+        self._rebuild_alpha_effective()
+    
+    def _rebuild_alpha_effective(self):
+        """重建 α_effective = α_base × U 查找表（U变化时调用）"""
+        self._alpha_eff_table = tuple(alpha * self._user_factor for alpha in self._alpha_table)
+        self._alpha_eff_lut = np.array(self._alpha_eff_table, dtype=np.float64)
     
     # ------------------------------------------------------------------------
     # 3.1 时间权重 w_time(t)
@@ -111,10 +234,10 @@ class CompleteMemoryEngine:
     
     def calculate_time_weight(
         self,
-        created_at: str,
-        last_activated_at: str,
+        created_ts: float,
+        last_activated_ts: float,
         category: MemoryCategory,
-        now: Optional[datetime] = None
+        now_ts: Optional[float] = None
     ) -> float:
         """
         计算时间权重
@@ -123,19 +246,16 @@ class CompleteMemoryEngine:
         
         α_effective = base_alpha × U × category_factor
         
-        使用 last_activated_at 计算活跃衰减
+        使用 last_activated_at（epoch秒）计算活跃衰减
         """
-        if now is None:
-            now = datetime.now()
+        if now_ts is None:
+            now_ts = datetime.now().timestamp()
         
         # 使用最后激活时间计算
-        last_active = datetime.fromisoformat(last_activated_at)
-        delta_seconds = (now - last_active).total_seconds()
-        t_days = delta_seconds / self.time_scale
+        t_days = (now_ts - last_activated_ts) / self.time_scale
         
-        # 类别衰减系数
-        alpha_base = self.category_decay_alpha.get(category, 0.01)
-        alpha_effective = alpha_base * self.user_factor
+        # 类别衰减系数（已乘入用户因子）
+        alpha_effective = self._alpha_eff_table[category.idx]
         
         w_time = 1.0 / (1.0 + alpha_effective * t_days)
         
@@ -147,8 +267,8 @@ class CompleteMemoryEngine:
     
     def calculate_semantic_boost(
         self,
-        last_mention_time: Optional[str],
-        now: Optional[datetime] = None
+        last_mention_ts: Optional[float],
+        now_ts: Optional[float] = None
     ) -> float:
         """
         计算语义强化因子
@@ -157,15 +277,15 @@ class CompleteMemoryEngine:
         
         当用户再次提及时，Δt为距上次提及的天数
         """
-        if not last_mention_time:
+        if last_mention_ts is None:
             return 1.0
         
-        if now is None:
-            now = datetime.now()
+        if now_ts is None:
+            now_ts = datetime.now().timestamp()
         
-        last_mention = datetime.fromisoformat(last_mention_time)
-        delta_seconds = (now - last_mention).total_seconds()
-        delta_days = delta_seconds / self.time_scale
+        delta_days = (now_ts - last_mention_ts) / self.time_scale
+        if delta_days >= self._semantic_horizon_days:
+            return 1.0
         
         # 语义强化：初始+50%，随时间指数衰减
         boost = 1.0 + 0.5 * math.exp(-0.05 * delta_days)
@@ -180,8 +300,8 @@ class CompleteMemoryEngine:
         self,
         is_negated: bool,
         is_corrected: bool,
-        correction_time: Optional[str],
-        now: Optional[datetime] = None
+        correction_ts: Optional[float],
+        now_ts: Optional[float] = None
     ) -> float:
         """
         计算冲突修正因子
@@ -193,16 +313,16 @@ class CompleteMemoryEngine:
         if not (is_negated or is_corrected):
             return 1.0
         
-        if not correction_time:
+        if correction_ts is None:
             # 刚否定/修正，立即降权
             return 0.3
         
-        if now is None:
-            now = datetime.now()
+        if now_ts is None:
+            now_ts = datetime.now().timestamp()
         
-        correction_dt = datetime.fromisoformat(correction_time)
-        delta_seconds = (now - correction_dt).total_seconds()
-        delta_days = delta_seconds / self.time_scale
+        delta_days = (now_ts - correction_ts) / self.time_scale
+        if delta_days >= self._conflict_horizon_days:
+            return 0.3
         
         # 冲突惩罚：初始70%降权，随时间恢复
         penalty = 0.3 + 0.7 * math.exp(-0.01 * delta_days)
@@ -215,17 +335,34 @@ class CompleteMemoryEngine:
     
     def get_importance_factor(self, category: MemoryCategory) -> float:
         """获取类别重要性因子"""
-        return self.category_importance.get(category, 1.0)
+        return self._importance_table[category.idx]
     
     # ------------------------------------------------------------------------
     # 3.5 动量因子 M(t)
     # ------------------------------------------------------------------------
     
+    def count_recent_mentions(
+        self,
+        recent_mentions: Iterable[Union[str, float]],
+        now_ts: float
+    ) -> int:
+        """
+        统计频繁强化窗口内的提及次数
+        
+        recent_mentions 为 MemoryMetadata 中的升序epoch秒队列时直接二分查找，
+        其他输入（如ISO字符串列表）先归一化
+        """
+        if not isinstance(recent_mentions, deque):
+            recent_mentions = normalize_mentions(recent_mentions)
+        
+        window_start = now_ts - self.frequent_window_hours * 3600
+        return len(recent_mentions) - bisect.bisect_left(recent_mentions, window_start)
+    
     def calculate_momentum(
         self,
         mention_count: int,
-        recent_mentions: List[str],
-        now: Optional[datetime] = None
+        recent_mentions: Iterable[Union[str, float]],
+        now_ts: Optional[float] = None
     ) -> float:
         """
         计算动量因子（防止过度放大）
@@ -234,20 +371,14 @@ class CompleteMemoryEngine:
         
         n 为近期提及次数（24小时内），上限约 1.3
         """
-        if now is None:
-            now = datetime.now()
+        if now_ts is None:
+            now_ts = datetime.now().timestamp()
         
         # 统计近期提及次数
-        window_start = now - timedelta(hours=self.frequent_window_hours)
-        recent_count = 0
-        
-        for mention_time_str in recent_mentions:
-            mention_time = datetime.fromisoformat(mention_time_str)
-            if mention_time >= window_start:
-                recent_count += 1
+        recent_count = self.count_recent_mentions(recent_mentions, now_ts)
         
-        # 动量因子：饱和曲线
-        momentum = 1.0 + 0.3 * (1.0 - math.exp(-0.5 * recent_count))
+        # 动量因子：饱和曲线（查表）
+        momentum = _MOMENTUM_TABLE[min(recent_count, MOMENTUM_LUT_MAX)]
         
         return momentum
     
@@ -265,33 +396,38 @@ class CompleteMemoryEngine:
         计算增强型权重
         
         公式: W(t) = w_time(t) × S(t) × C(t) × I × U × M(t)
+        
+        冻结记忆不参与被动衰减，PASSIVE_DECAY 时直接返回其当前因子
         """
         metadata = memory.metadata
+        if trigger == UpdateTrigger.PASSIVE_DECAY and metadata.is_frozen:
+            return metadata.factors
+        
+        if now is None:
+            now = datetime.now()
+        
+        now_ts = now.timestamp()
         
         # 1. 时间权重 w_time(t)
         w_time = self.calculate_time_weight(
-            metadata.created_at,
-            metadata.last_activated_at,
+            metadata._created_ts,
+            metadata._last_act_ts,
             metadata.category,
-            now
+            now_ts
         )
         
         # 2. 语义强化 S(t)
         semantic_boost = self.calculate_semantic_boost(
-            metadata.last_mention_time,
-            now
+            metadata._last_mention_ts,
+            now_ts
         )
         
         # 3. 冲突修正 C(t)
-        correction_time = None
-        if metadata.correction_history:
-            correction_time = metadata.correction_history[-1].get("timestamp")
-        
         conflict_penalty = self.calculate_conflict_penalty(
             metadata.is_negated,
             metadata.is_corrected,
-            correction_time,
-            now
+            metadata._last_correction_ts,
+            now_ts
         )
         
         # 4. 重要性 I
@@ -304,7 +440,7 @@ class CompleteMemoryEngine:
         momentum = self.calculate_momentum(
             metadata.mention_count,
             metadata.recent_mentions,
-            now
+            now_ts
         )
         
         # 综合权重
@@ -325,26 +461,228 @@ class CompleteMemoryEngine:
         
         return factors
     
+    # ------------------------------------------------------------------------
+    # 3.7 批量权重（被动衰减扫描）
+    # ------------------------------------------------------------------------
+    
+    def calculate_enhanced_weights(
+        self,
+        snapshot: Dict[str, Any],
+        now: Optional[datetime] = None,
+        chunk_size: Optional[int] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        批量计算增强型权重
+        
+        输入为 MemoryStore.snapshot_arrays() 的列式快照，对所有记忆一次性
+        计算六个因子，结果与逐条调用 calculate_enhanced_weight 一致。
+        
+        Args:
+            snapshot: 列式快照（内存数组或 memmap）
+            now: 当前时间
+            chunk_size: 分块行数；memmap 快照按块顺序扫描，常驻内存为 O(chunk)
+        
+        Returns:
+            与 MemoryFactors 字段同名的列数组
+        """
+        if now is None:
+            now = datetime.now()
+        now_ts = now.timestamp()
+        
+        compute = (
+            self._calculate_weights_kernel
+            if _compute_weights_kernel is not None
+            else self._calculate_weights_numpy
+        )
+        
+        n = len(snapshot["category"])
+        if chunk_size is None or n <= chunk_size:
+            return compute(snapshot, now_ts)
+        
+        out = {name: np.empty(n, dtype=np.float64) for name in self.FACTOR_COLUMNS}
+        for start in range(0, n, chunk_size):
+            stop = min(start + chunk_size, n)
+            chunk = compute(self._slice_snapshot(snapshot, start, stop), now_ts)
+            for name, values in chunk.items():
+                out[name][start:stop] = values
+        
+        return out
+    
+    @staticmethod
+    def _slice_snapshot(snapshot: Dict[str, Any], start: int, stop: int) -> Dict[str, Any]:
+        """截取快照的 [start, stop) 行，CSR偏移重新以0为基准"""
+        offsets = np.asarray(snapshot["mention_offsets"][start:stop + 1])
+        base = offsets[0]
+        
+        chunk = {
+            name: column[start:stop]
+            for name, column in snapshot.items()
+            if name not in ("mention_ts", "mention_offsets")
+        }
+        chunk["mention_ts"] = snapshot["mention_ts"][base:offsets[-1]]
+        chunk["mention_offsets"] = offsets - base
+        return chunk
+    
+    def _calculate_weights_kernel(
+        self,
+        snapshot: Dict[str, Any],
+        now_ts: float
+    ) -> Dict[str, np.ndarray]:
+        """Numba内核实现"""
+        n = len(snapshot["category"])
+        out = {name: np.empty(n, dtype=np.float64) for name in self.FACTOR_COLUMNS}
+        
+        _compute_weights_kernel(
+            snapshot["last_activated_ts"],
+            snapshot["last_mention_ts"],
+            snapshot["correction_ts"],
+            snapshot["is_negated"],
+            snapshot["is_corrected"],
+            snapshot["category"],
+            snapshot["mention_ts"],
+            snapshot["mention_offsets"],
+            self._alpha_eff_lut,
+            self._importance_lut,
+            MOMENTUM_LUT,
+            float(self.user_factor),
+            now_ts,
+            1.0 / self.time_scale,
+            now_ts - self.frequent_window_hours * 3600,
+            self._semantic_horizon_days,
+            self._conflict_horizon_days,
+            *out.values()
+        )
+        
+        return out
+    
+    def _calculate_weights_numpy(
+        self,
+        snapshot: Dict[str, Any],
+        now_ts: float
+    ) -> Dict[str, np.ndarray]:
+        """NumPy向量化实现"""
+        inv_scale = 1.0 / self.time_scale
+        category = snapshot["category"]
+        
+        # 1. 时间权重 w_time(t)
+        t_days = (now_ts - snapshot["last_activated_ts"]) * inv_scale
+        w_time = 1.0 / (1.0 + self._alpha_eff_lut[category] * t_days)
+        
+        # 2. 语义强化 S(t)
+        last_mention = snapshot["last_mention_ts"]
+        mention_days = (now_ts - last_mention) * inv_scale
+        semantic_boost = np.where(
+            np.isnan(last_mention),
+            1.0,
+            1.0 + 0.5 * np.exp(-0.05 * mention_days)
+        )
+        
+        # 3. 冲突修正 C(t)
+        correction = snapshot["correction_ts"]
+        correction_days = (now_ts - correction) * inv_scale
+        conflict_penalty = np.where(
+            snapshot["is_negated"] | snapshot["is_corrected"],
+            np.where(
+                np.isnan(correction),
+                0.3,
+                0.3 + 0.7 * np.exp(-0.01 * correction_days)
+            ),
+            1.0
+        )
+        
+        # 4. 重要性 I / 5. 用户因子 U
+        importance = self._importance_lut[category]
+        user_factor = np.full(len(category), self.user_factor)
+        
+        # 6. 动量 M(t)：窗口内提及数 = 前缀和之差
+        window_start = now_ts - self.frequent_window_hours * 3600
+        hits = np.concatenate(([0], np.cumsum(snapshot["mention_ts"] >= window_start)))
+        offsets = snapshot["mention_offsets"]
+        recent_count = hits[offsets[1:]] - hits[offsets[:-1]]
+        momentum = MOMENTUM_LUT[np.minimum(recent_count, MOMENTUM_LUT_MAX)]
+        
+        # 综合权重 + 边界约束
+        total_weight = np.clip(
+            w_time * semantic_boost * conflict_penalty * importance * user_factor * momentum,
+            0.01,
+            2.0
+        )
+        
+        return {
+            "time_weight": w_time,
+            "semantic_boost": semantic_boost,
+            "conflict_penalty": conflict_penalty,
+            "importance": importance,
+            "user_factor": user_factor,
+            "momentum": momentum,
+            "total_weight": total_weight
+        }
+    
+    def factors_at(self, weights: Dict[str, np.ndarray], i: int) -> MemoryFactors:
+        """从批量结果中取出第i条记忆的 MemoryFactors"""
+        return MemoryFactors(**{name: float(values[i]) for name, values in weights.items()})
+    
+    def batch_passive_decay(
+        self,
+        snapshot: Dict[str, Any],
+        now: Optional[datetime] = None,
+        chunk_size: Optional[int] = None
+    ) -> Tuple[np.ndarray, np.ndarray, Dict[str, np.ndarray]]:
+        """
+        被动衰减批处理：权重计算 + 层级判定一次完成
+        
+        冻结、已删除及3级敏感记忆不参与压缩。
+        
+        Returns:
+            (changed, new_levels, weights)
+            changed: 层级发生变化的行号
+            new_levels: 这些行的目标层级（MemoryLevel.idx）
+            weights: 全部行的因子列数组
+        """
+        weights = self.calculate_enhanced_weights(snapshot, now, chunk_size)
+        levels = self.decide_compression_levels(
+            weights["total_weight"],
+            snapshot["is_frozen"],
+            snapshot["is_sensitive"],
+            snapshot["sensitivity_level"]
+        )
+        
+        eligible = ~(
+            snapshot["is_frozen"]
+            | snapshot["is_deleted"]
+            | (snapshot["is_sensitive"] & (snapshot["sensitivity_level"] >= 3))
+        )
+        changed = np.flatnonzero(eligible & (levels != snapshot["level"]))
+        
+        return changed, levels[changed], weights
+    
     # ------------------------------------------------------------------------
     # 4. 决策引擎
     # ------------------------------------------------------------------------
     
     def detect_frequent_reinforce(
         self,
-        recent_mentions: List[str],
+        recent_mentions: Union[Deque[float], List[str]],
         now: Optional[datetime] = None
     ) -> bool:
-        """检测频繁强化"""
+        """
+        检测频繁强化
+        
+        总提及数不足阈值时直接返回；升序队列只需检查倒数第 threshold 条
+        是否落在窗口内，无需统计全部近期提及
+        """
+        threshold = self.frequent_threshold
+        if len(recent_mentions) < threshold:
+            return False
+        
         if now is None:
             now = datetime.now()
         
-        window_start = now - timedelta(hours=self.frequent_window_hours)
-        recent_count = sum(
-            1 for m in recent_mentions
-            if datetime.fromisoformat(m) >= window_start
-        )
+        if not isinstance(recent_mentions, deque):
+            recent_mentions = normalize_mentions(recent_mentions)
         
-        return recent_count >= self.frequent_threshold
+        window_start = now.timestamp() - self.frequent_window_hours * 3600
+        return threshold <= 0 or recent_mentions[-threshold] >= window_start
     
     def decide_compression_level(
         self,
@@ -374,11 +712,38 @@ class CompleteMemoryEngine:
                 return MemoryLevel.TAG
         
         # 根据权重阈值压缩
-        for level, (min_w, max_w) in self.level_thresholds.items():
-            if min_w <= weight < max_w:
-                return level
+        i = bisect.bisect_right(self._level_bounds, weight) - 1
+        if i < 0:
+            return MemoryLevel.ARCHIVE
+        return self._levels_by_bound[i]
+    
+    def decide_compression_levels(
+        self,
+        weights: np.ndarray,
+        is_frozen: np.ndarray,
+        is_sensitive: np.ndarray,
+        sensitivity_level: np.ndarray
+    ) -> np.ndarray:
+        """
+        批量决定压缩层级（规则同 decide_compression_level）
         
-        return MemoryLevel.ARCHIVE
+        Returns:
+            MemoryLevel.idx 组成的int8数组
+        """
+        i = np.searchsorted(self._level_bounds_arr, weights, side="right") - 1
+        levels = np.where(
+            i >= 0,
+            self._level_idx_by_bound[np.maximum(i, 0)],
+            MemoryLevel.ARCHIVE.idx
+        ).astype(np.int8)
+        
+        # 敏感性保护（优先级低于冻结）
+        levels[is_sensitive & (sensitivity_level == 1) & (weights < 0.1)] = MemoryLevel.TAG.idx
+        levels[is_sensitive & (sensitivity_level == 2) & (weights < 0.3)] = MemoryLevel.SUMMARY.idx
+        levels[is_sensitive & (sensitivity_level >= 3)] = MemoryLevel.FULL.idx
+        levels[is_frozen] = MemoryLevel.FULL.idx
+        
+        return levels
     
     def decide_action(
         self,
@@ -519,12 +884,11 @@ class CompleteMemoryEngine:
         new_memory_id = id_generator.generate_memory_id(user_id)
         
         # 2. 提取共同特征
-        categories = [m.metadata.category for m in memories]
-        most_common_category = max(set(categories), key=categories.count)
+        most_common_category = Counter(
+            m.metadata.category for m in memories
+        ).most_common(1)[0][0]
         
-        modalities_set = set()
-        for m in memories:
-            modalities_set.update(m.metadata.modalities)
+        modalities_set = set().union(*(m.metadata.modalities for m in memories))
         
         # 3. 生成摘要内容（简化版，生产环境应使用LLM）
         texts = [m.content.text for m in memories if m.content.text]
@@ -587,29 +951,35 @@ class CompleteMemoryEngine:
         factors: MemoryFactors,
         reason: str
     ):
-        """添加权重变化日志"""
+        """
+        添加权重变化日志
+        
+        按 log_verbosity 决定记录内容；数值保留原始精度，导出（to_dict / get_weight_history）时保留4位小数
+        """
+        if self.log_verbosity <= 0:
+            return
+        
         log_entry = {
             "timestamp": datetime.now().isoformat(),
             "trigger": trigger.value,
-            "old_weight": round(old_weight, 4),
-            "new_weight": round(new_weight, 4),
-            "change": round(new_weight - old_weight, 4),
-            "factors": {
-                "w_time": round(factors.time_weight, 4),
-                "S": round(factors.semantic_boost, 4),
-                "C": round(factors.conflict_penalty, 4),
-                "I": round(factors.importance, 4),
-                "U": round(factors.user_factor, 4),
-                "M": round(factors.momentum, 4)
-            },
+            "old_weight": old_weight,
+            "new_weight": new_weight,
+            "change": new_weight - old_weight,
             "reason": reason
         }
         
+        if self.log_verbosity >= 2:
+            log_entry["factors"] = {
+                "w_time": factors.time_weight,
+                "S": factors.semantic_boost,
+                "C": factors.conflict_penalty,
+                "I": factors.importance,
+                "U": factors.user_factor,
+                "M": factors.momentum
+            }
+        
+        # 有界队列，自动只保留最近50条
         memory.metadata.weight_change_log.append(log_entry)
-        
-        # 保留最近50条
-        if len(memory.metadata.weight_change_log) > 50:
-            memory.metadata.weight_change_log = memory.metadata.weight_change_log[-50:]
 
 
 # 使用示例
@@ -15,18 +15,62 @@ MemoryID结构：
 """
 
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional, List, Tuple, Set
-from dataclasses import dataclass, field, asdict
+from typing import Dict, Any, Optional, List, Tuple, Set, Deque, Iterable, Union
+from dataclasses import dataclass, field, fields
+from collections import deque
 from enum import Enum
+import bisect
 import logging
 import math
 import uuid
 import hashlib
-import json
+import os
+import sys
+
+import numpy as np
+import orjson
 
 logger = logging.getLogger(__name__)
 
 
+def _iso_to_ts(value: Optional[str]) -> Optional[float]:
+    """ISO时间字符串 → epoch秒"""
+    if not value:
+        return None
+    return datetime.fromisoformat(value).timestamp()
+
+
+def _ts_or_nan(ts: Optional[float]) -> float:
+    """缺失的epoch秒在快照中以NaN表示"""
+    return math.nan if ts is None else ts
+
+
+# 近期提及环形缓冲容量
+RECENT_MENTIONS_MAXLEN = 64
+
+# 权重变化日志保留条数
+WEIGHT_CHANGE_LOG_MAXLEN = 50
+
+
+def round_weight_log_entry(entry: Dict) -> Dict:
+    """权重日志条目的导出形式：权重与因子保留4位小数（日志内部保存原始精度）"""
+    rounded = dict(entry)
+    for key in ("old_weight", "new_weight", "change"):
+        if key in rounded:
+            rounded[key] = round(rounded[key], 4)
+    if "factors" in rounded:
+        rounded["factors"] = {k: round(v, 4) for k, v in rounded["factors"].items()}
+    return rounded
+
+
+def normalize_mentions(values: Iterable[Union[str, float]]) -> Deque[float]:
+    """将提及时间（ISO字符串或epoch秒）转换为升序、有界的epoch秒队列"""
+    timestamps = sorted(
+        _iso_to_ts(v) if isinstance(v, str) else float(v) for v in values
+    )
+    return deque(timestamps, maxlen=RECENT_MENTIONS_MAXLEN)
+
+
 # ============================================================================
 # 1. 身份与根ID管理
 # ============================================================================
@@ -112,7 +156,14 @@ class MemoryIDGenerator:
 # 2. 记忆存储层
 # ============================================================================
 
-class MemoryLevel(Enum):
+class _IndexedEnum(Enum):
+    """成员附带声明顺序下标 idx，用于快照int8编码与查找表索引"""
+    
+    def __init__(self, *args):
+        self.idx = len(type(self).__members__)
+
+
+class MemoryLevel(_IndexedEnum):
     """记忆层级"""
     FULL = "full"           # 完整记忆
     SUMMARY = "summary"     # 压缩摘要
@@ -121,7 +172,7 @@ class MemoryLevel(Enum):
     ARCHIVE = "archive"     # 存档
 
 
-class MemoryCategory(Enum):
+class MemoryCategory(_IndexedEnum):
     """记忆类别"""
     IDENTITY = "identity"               # 身份信息
     STABLE_PREFERENCE = "stable_preference"  # 稳定偏好
@@ -132,7 +183,7 @@ class MemoryCategory(Enum):
     TEMPORARY = "temporary"             # 临时信息
 
 
-class Modality(Enum):
+class Modality(_IndexedEnum):
     """模态类型"""
     TEXT = "text"
     IMAGE = "image"
@@ -147,7 +198,7 @@ class QueryMode(Enum):
     DEBUG = "debug"         # 调试模式：显示所有层级
 
 
-@dataclass
+@dataclass(slots=True)
 class MultimodalContent:
     """多模态内容"""
     text: Optional[str] = None
@@ -170,7 +221,7 @@ class MultimodalContent:
         return modalities
 
 
-@dataclass
+@dataclass(slots=True)
 class MemoryFactors:
     """记忆权重因子"""
     time_weight: float = 1.0            # w_time(t)
@@ -194,7 +245,18 @@ class MemoryFactors:
         return self.total_weight
 
 
-@dataclass
+# ISO时间字段 → 缓存的epoch秒字段
+_TS_CACHE_FIELDS = {
+    "created_at": "_created_ts",
+    "last_activated_at": "_last_act_ts",
+    "last_mention_time": "_last_mention_ts",
+}
+
+# 作为索引键的标识字段：驻留后同一ID共享一个字符串对象
+_INTERNED_ID_FIELDS = frozenset({"user_id", "device_uuid", "group_id"})
+
+
+@dataclass(slots=True)
 class MemoryMetadata:
     """记忆元数据"""
     
@@ -218,7 +280,7 @@ class MemoryMetadata:
     mention_count: int = 0              # 提及次数
     reinforce_count: int = 0            # 强化次数
     last_mention_time: Optional[str] = None
-    recent_mentions: List[str] = field(default_factory=list)
+    recent_mentions: Deque[float] = field(default_factory=deque)  # 升序epoch秒，容量有限
     
     # ⚠️ 冲突与修正
     is_negated: bool = False
@@ -246,16 +308,63 @@ class MemoryMetadata:
     is_frozen: bool = False             # 用户冻结（不自动压缩）
     
     # 📝 可解释性
-    weight_change_log: List[Dict] = field(default_factory=list)
+    weight_change_log: Deque[Dict] = field(default_factory=deque)  # 保留最近50条
     compression_history: List[Dict] = field(default_factory=list)
     
     # 👥 群体记忆
     is_group_memory: bool = False       # 是否为群体记忆
     group_id: Optional[str] = None      # 群组ID
     shared_with: List[str] = field(default_factory=list)  # 分享给哪些用户
-
-
-@dataclass
+    
+    # ⏱️ epoch秒缓存（随ISO字段写入同步更新，不参与序列化）
+    _created_ts: Optional[float] = field(init=False, repr=False, compare=False)
+    _last_act_ts: Optional[float] = field(init=False, repr=False, compare=False)
+    _last_mention_ts: Optional[float] = field(init=False, repr=False, compare=False)
+    _last_correction_ts: Optional[float] = field(init=False, repr=False, compare=False)
+    
+    def __setattr__(self, name: str, value: Any):
+        object.__setattr__(self, name, value)
+        
+        ts_name = _TS_CACHE_FIELDS.get(name)
+        if ts_name is not None:
+            object.__setattr__(self, ts_name, _iso_to_ts(value))
+        elif name in _INTERNED_ID_FIELDS:
+            if isinstance(value, str):
+                object.__setattr__(self, name, sys.intern(value))
+        elif name == "recent_mentions":
+            object.__setattr__(self, name, normalize_mentions(value))
+        elif name == "weight_change_log":
+            object.__setattr__(self, name, deque(value, maxlen=WEIGHT_CHANGE_LOG_MAXLEN))
+        elif name == "correction_history":
+            object.__setattr__(
+                self,
+                "_last_correction_ts",
+                _iso_to_ts(value[-1].get("timestamp")) if value else None
+            )
+    
+    def record_mention(self, timestamp: str):
+        """记录一次用户提及"""
+        ts = _iso_to_ts(timestamp)
+        self.mention_count += 1
+        if self._last_mention_ts is None or ts >= self._last_mention_ts:
+            self.last_mention_time = timestamp
+        
+        mentions = self.recent_mentions
+        if not mentions or ts >= mentions[-1]:
+            mentions.append(ts)
+        elif len(mentions) < RECENT_MENTIONS_MAXLEN or ts > mentions[0]:
+            # 乱序写入：保持升序，满容量时先淘汰最早的记录
+            if len(mentions) == RECENT_MENTIONS_MAXLEN:
+                mentions.popleft()
+            bisect.insort(mentions, ts)
+
+    def record_correction(self, timestamp: str, **details: Any):
+        """追加一条修正/否定记录，并同步缓存最近修正时间"""
+        self.correction_history.append({"timestamp": timestamp, **details})
+        object.__setattr__(self, "_last_correction_ts", _iso_to_ts(timestamp))
+
+
+@dataclass(slots=True)
 class Memory:
     """完整记忆对象"""
     
@@ -269,11 +378,45 @@ class Memory:
     entities: List[Dict] = field(default_factory=list)  # 命名实体
     
     def to_dict(self) -> Dict[str, Any]:
-        """转换为字典"""
+        """
+        转换为字典
+        
+        直接按字段投影：列表按引用传递、枚举转为value、值为None的字段省略，
+        避免 asdict 的递归深拷贝。
+        """
+        content = self.content
+        content_dict = {
+            name: value for name in _CONTENT_FIELDS
+            if (value := getattr(content, name)) is not None
+        }
+        
+        metadata = self.metadata
+        metadata_dict = {
+            name: value for name in _METADATA_PLAIN_FIELDS
+            if (value := getattr(metadata, name)) is not None
+        }
+        factors = metadata.factors
+        metadata_dict["level"] = metadata.level.value
+        metadata_dict["category"] = metadata.category.value
+        metadata_dict["modalities"] = [m.value for m in metadata.modalities]
+        metadata_dict["factors"] = {
+            "time_weight": factors.time_weight,
+            "semantic_boost": factors.semantic_boost,
+            "conflict_penalty": factors.conflict_penalty,
+            "importance": factors.importance,
+            "user_factor": factors.user_factor,
+            "momentum": factors.momentum,
+            "total_weight": factors.total_weight
+        }
+        metadata_dict["recent_mentions"] = list(metadata.recent_mentions)
+        metadata_dict["weight_change_log"] = [
+            round_weight_log_entry(entry) for entry in metadata.weight_change_log
+        ]
+        
         return {
             "memory_id": self.memory_id,
-            "content": asdict(self.content),
-            "metadata": asdict(self.metadata),
+            "content": content_dict,
+            "metadata": metadata_dict,
             "tags": self.tags,
             "keywords": self.keywords,
             "entities": self.entities
@@ -284,14 +427,15 @@ class Memory:
         """从字典创建"""
         content = MultimodalContent(**data["content"])
         
-        # 重建metadata
+        # 重建metadata（不修改输入字典；枚举按value查表还原）
         metadata_dict = data["metadata"]
-        metadata_dict["level"] = MemoryLevel(metadata_dict["level"])
-        metadata_dict["category"] = MemoryCategory(metadata_dict["category"])
-        metadata_dict["modalities"] = [Modality(m) for m in metadata_dict.get("modalities", [])]
-        metadata_dict["factors"] = MemoryFactors(**metadata_dict.get("factors", {}))
-        
-        metadata = MemoryMetadata(**metadata_dict)
+        metadata = MemoryMetadata(**{
+            **metadata_dict,
+            "level": _LEVEL_BY_VALUE[metadata_dict["level"]],
+            "category": _CATEGORY_BY_VALUE[metadata_dict["category"]],
+            "modalities": [_MODALITY_BY_VALUE[m] for m in metadata_dict.get("modalities", ())],
+            "factors": MemoryFactors(**metadata_dict.get("factors", {}))
+        })
         
         return cls(
             memory_id=data["memory_id"],
@@ -303,59 +447,141 @@ class Memory:
         )
 
 
+# from_dict 枚举还原查找表（value → 成员）
+_LEVEL_BY_VALUE = {m.value: m for m in MemoryLevel}
+_CATEGORY_BY_VALUE = {m.value: m for m in MemoryCategory}
+_MODALITY_BY_VALUE = {m.value: m for m in Modality}
+
+# to_dict 直接投影的字段（私有缓存字段与需转换的字段除外）
+_CONTENT_FIELDS = tuple(f.name for f in fields(MultimodalContent))
+_METADATA_PLAIN_FIELDS = tuple(
+    f.name for f in fields(MemoryMetadata)
+    if not f.name.startswith("_") and f.name not in {
+        "level", "category", "modalities", "factors",
+        "recent_mentions", "weight_change_log"
+    }
+)
+
+
 # ============================================================================
 # 3. 记忆存储库
 # ============================================================================
 
+# 列式快照中每条记忆一个元素的列（名称, dtype），按此顺序落盘
+_SNAPSHOT_ROW_COLUMNS = (
+    ("created_ts", np.float64),
+    ("last_activated_ts", np.float64),
+    ("last_mention_ts", np.float64),
+    ("correction_ts", np.float64),
+    ("level", np.int8),
+    ("category", np.int8),
+    ("modality_mask", np.uint8),
+    ("is_negated", np.bool_),
+    ("is_corrected", np.bool_),
+    ("is_frozen", np.bool_),
+    ("is_deleted", np.bool_),
+    ("is_sensitive", np.bool_),
+    ("sensitivity_level", np.int8),
+)
+_SNAPSHOT_ARRAY_NAMES = tuple(name for name, _ in _SNAPSHOT_ROW_COLUMNS) + ("mention_ts", "mention_offsets")
+
+
+def _fill_snapshot_rows(
+    memories: List["Memory"],
+    columns: Dict[str, np.ndarray],
+    mention_offsets: np.ndarray,
+    mention_start: int
+) -> List[float]:
+    """
+    将 memories 逐行写入等长的列数组
+    
+    mention_offsets 长度为 len(memories)+1，偏移量从 mention_start 起算；
+    返回这些记忆的提及时间（按行顺序展开）
+    """
+    created_ts = columns["created_ts"]
+    last_activated_ts = columns["last_activated_ts"]
+    last_mention_ts = columns["last_mention_ts"]
+    correction_ts = columns["correction_ts"]
+    level = columns["level"]
+    category = columns["category"]
+    modality_mask = columns["modality_mask"]
+    is_negated = columns["is_negated"]
+    is_corrected = columns["is_corrected"]
+    is_frozen = columns["is_frozen"]
+    is_deleted = columns["is_deleted"]
+    is_sensitive = columns["is_sensitive"]
+    sensitivity_level = columns["sensitivity_level"]
+    mention_ts: List[float] = []
+    
+    mention_offsets[0] = mention_start
+    for i, memory in enumerate(memories):
+        metadata = memory.metadata
+        created_ts[i] = metadata._created_ts
+        last_activated_ts[i] = metadata._last_act_ts
+        last_mention_ts[i] = _ts_or_nan(metadata._last_mention_ts)
+        correction_ts[i] = _ts_or_nan(metadata._last_correction_ts)
+        level[i] = metadata.level.idx
+        category[i] = metadata.category.idx
+        modality_mask[i] = sum(1 << m.idx for m in metadata.modalities)
+        is_negated[i] = metadata.is_negated
+        is_corrected[i] = metadata.is_corrected
+        is_frozen[i] = metadata.is_frozen
+        is_deleted[i] = metadata.is_deleted
+        is_sensitive[i] = metadata.is_sensitive
+        sensitivity_level[i] = metadata.sensitivity_level
+        mention_ts.extend(metadata.recent_mentions)
+        mention_offsets[i + 1] = mention_start + len(mention_ts)
+    
+    return mention_ts
+
+
 class MemoryStore:
     """记忆存储库"""
     
     def __init__(self):
         self.memories: Dict[str, Memory] = {}
-        self.user_index: Dict[str, Set[str]] = {}  # user_id -> memory_ids
-        self.device_index: Dict[str, Set[str]] = {}  # device_uuid -> memory_ids
-        self.group_index: Dict[str, Set[str]] = {}  # group_id -> memory_ids
+        # 索引直接引用 Memory（按插入顺序），读取时无需再查 memories
+        self.user_index: Dict[str, Dict[str, Memory]] = {}  # user_id -> {memory_id: memory}（未删除）
+        self.deleted_user_index: Dict[str, Dict[str, Memory]] = {}  # user_id -> 软删除的记忆
+        self.device_index: Dict[str, Dict[str, Memory]] = {}  # device_uuid -> {memory_id: memory}
+        self.group_index: Dict[str, Dict[str, Memory]] = {}  # group_id -> {memory_id: memory}
     
     def add_memory(self, memory: Memory):
         """添加记忆"""
         self.memories[memory.memory_id] = memory
         
         # 更新索引
-        user_id = memory.metadata.user_id
-        if user_id not in self.user_index:
-            self.user_index[user_id] = set()
-        self.user_index[user_id].add(memory.memory_id)
-        
-        device_uuid = memory.metadata.device_uuid
-        if device_uuid not in self.device_index:
-            self.device_index[device_uuid] = set()
-        self.device_index[device_uuid].add(memory.memory_id)
+        memory_id = memory.memory_id
+        metadata = memory.metadata
+        live_user_memories = self.user_index.setdefault(metadata.user_id, {})
+        if metadata.is_deleted:
+            self.deleted_user_index.setdefault(metadata.user_id, {})[memory_id] = memory
+        else:
+            live_user_memories[memory_id] = memory
+        self.device_index.setdefault(metadata.device_uuid, {})[memory_id] = memory
         
         # 群组索引
-        if memory.metadata.is_group_memory and memory.metadata.group_id:
-            group_id = memory.metadata.group_id
-            if group_id not in self.group_index:
-                self.group_index[group_id] = set()
-            self.group_index[group_id].add(memory.memory_id)
+        if metadata.is_group_memory and metadata.group_id:
+            self.group_index.setdefault(metadata.group_id, {})[memory_id] = memory
     
     def get_memory(self, memory_id: str) -> Optional[Memory]:
         """获取记忆"""
         return self.memories.get(memory_id)
     
-    def get_user_memories(self, user_id: str) -> List[Memory]:
-        """获取用户的所有记忆"""
-        memory_ids = self.user_index.get(user_id, set())
-        return [self.memories[mid] for mid in memory_ids if mid in self.memories]
+    def get_user_memories(self, user_id: str, include_deleted: bool = False) -> List[Memory]:
+        """获取用户的记忆（默认不含软删除的记忆）"""
+        memories = list(self.user_index.get(user_id, {}).values())
+        if include_deleted:
+            memories.extend(self.deleted_user_index.get(user_id, {}).values())
+        return memories
     
     def get_device_memories(self, device_uuid: str) -> List[Memory]:
         """获取设备的所有记忆"""
-        memory_ids = self.device_index.get(device_uuid, set())
-        return [self.memories[mid] for mid in memory_ids if mid in self.memories]
+        return list(self.device_index.get(device_uuid, {}).values())
     
     def get_group_memories(self, group_id: str) -> List[Memory]:
         """获取群组的所有记忆"""
-        memory_ids = self.group_index.get(group_id, set())
-        return [self.memories[mid] for mid in memory_ids if mid in self.memories]
+        return list(self.group_index.get(group_id, {}).values())
     
     def delete_memory(self, memory_id: str, soft_delete: bool = True):
         """删除记忆"""
@@ -364,47 +590,165 @@ class MemoryStore:
             return
         
         if soft_delete:
-            # 软删除（标记）
+            # 软删除（标记，并移出用户的活跃索引）
             memory.metadata.is_deleted = True
             memory.metadata.deletion_time = datetime.now().isoformat()
+            
+            user_id = memory.metadata.user_id
+            self.user_index.get(user_id, {}).pop(memory_id, None)
+            self.deleted_user_index.setdefault(user_id, {})[memory_id] = memory
         else:
             # 硬删除
             del self.memories[memory_id]
             
             # 清理索引
-            user_id = memory.metadata.user_id
-            if user_id in self.user_index:
-                self.user_index[user_id].discard(memory_id)
-            
-            device_uuid = memory.metadata.device_uuid
-            if device_uuid in self.device_index:
-                self.device_index[device_uuid].discard(memory_id)
-            
-            if memory.metadata.group_id:
-                group_id = memory.metadata.group_id
-                if group_id in self.group_index:
-                    self.group_index[group_id].discard(memory_id)
+            metadata = memory.metadata
+            self.user_index.get(metadata.user_id, {}).pop(memory_id, None)
+            self.deleted_user_index.get(metadata.user_id, {}).pop(memory_id, None)
+            self.device_index.get(metadata.device_uuid, {}).pop(memory_id, None)
+            if metadata.group_id:
+                self.group_index.get(metadata.group_id, {}).pop(memory_id, None)
+    
+    def snapshot_arrays(
+        self,
+        memories: Optional[List[Memory]] = None,
+        mmap_dir: Optional[str] = None,
+        chunk_size: int = 65536
+    ) -> Dict[str, Any]:
+        """
+        生成列式快照（Struct-of-Arrays），供批量权重计算使用
+        
+        时间戳取自 MemoryMetadata 的epoch秒缓存（缺失为NaN），枚举以 idx 编码为int8，
+        模态编码为位掩码（第k位对应 Modality.idx == k），近期提及按CSR方式展开：
+        第i条记忆的提及时间为 mention_ts[mention_offsets[i]:mention_offsets[i+1]]
+        
+        Args:
+            memories: 参与快照的记忆，默认全部
+            mmap_dir: 若指定，各列按预先确定的大小创建 .npy memmap，逐块（chunk_size行）
+                填充写入，以只读 memmap 返回（见 load_snapshot），构建时常驻内存为 O(chunk)
+            chunk_size: 落盘时每块的行数
+        """
+        if memories is None:
+            memories = list(self.memories.values())
+        
+        n = len(memories)
+        memory_ids = [m.memory_id for m in memories]
+        
+        if mmap_dir is None:
+            columns = {name: np.empty(n, dtype=dtype) for name, dtype in _SNAPSHOT_ROW_COLUMNS}
+            mention_offsets = np.empty(n + 1, dtype=np.int64)
+            mention_ts = _fill_snapshot_rows(memories, columns, mention_offsets, 0)
+            return {
+                "memory_ids": memory_ids,
+                **columns,
+                "mention_ts": np.asarray(mention_ts, dtype=np.float64),
+                "mention_offsets": mention_offsets
+            }
+        
+        os.makedirs(mmap_dir, exist_ok=True)
+        total_mentions = sum(len(m.metadata.recent_mentions) for m in memories)
+        
+        def open_column(name: str, dtype, length: int) -> np.ndarray:
+            return np.lib.format.open_memmap(
+                os.path.join(mmap_dir, f"{name}.npy"), mode='w+', dtype=dtype, shape=(length,)
+            )
+        
+        out = {name: open_column(name, dtype, n) for name, dtype in _SNAPSHOT_ROW_COLUMNS}
+        out_offsets = open_column("mention_offsets", np.int64, n + 1)
+        out_mentions = open_column("mention_ts", np.float64, total_mentions)
+        out_offsets[0] = 0
+        
+        # 每块先在小缓冲区中填充，再整段写入memmap
+        chunk_size = max(1, min(chunk_size, n))
+        buffers = {name: np.empty(chunk_size, dtype=dtype) for name, dtype in _SNAPSHOT_ROW_COLUMNS}
+        offsets_buffer = np.empty(chunk_size + 1, dtype=np.int64)
+        mention_pos = 0
+        for start in range(0, n, chunk_size):
+            part = memories[start:start + chunk_size]
+            k = len(part)
+            views = {name: buffer[:k] for name, buffer in buffers.items()}
+            mentions = _fill_snapshot_rows(part, views, offsets_buffer[:k + 1], mention_pos)
+            for name, view in views.items():
+                out[name][start:start + k] = view
+            out_offsets[start + 1:start + k + 1] = offsets_buffer[1:k + 1]
+            out_mentions[mention_pos:mention_pos + len(mentions)] = mentions
+            mention_pos += len(mentions)
+        
+        for column in (*out.values(), out_offsets, out_mentions):
+            column.flush()
+        del out, out_offsets, out_mentions
+        
+        with open(os.path.join(mmap_dir, "memory_ids.json"), 'wb') as f:
+            f.write(orjson.dumps(memory_ids))
+        
+        return {"memory_ids": memory_ids, **self._open_snapshot_columns(mmap_dir)}
+    
+    @staticmethod
+    def save_snapshot(snapshot: Dict[str, Any], mmap_dir: str):
+        """将内存中的列式快照写入目录：每列一个 .npy 文件，memory_ids 写入 JSON"""
+        os.makedirs(mmap_dir, exist_ok=True)
+        
+        with open(os.path.join(mmap_dir, "memory_ids.json"), 'wb') as f:
+            f.write(orjson.dumps(snapshot["memory_ids"]))
+        for name in _SNAPSHOT_ARRAY_NAMES:
+            np.save(os.path.join(mmap_dir, f"{name}.npy"), snapshot[name])
+    
+    @staticmethod
+    def load_snapshot(mmap_dir: str) -> Dict[str, Any]:
+        """
+        以只读 memmap 打开落盘的列式快照
+        
+        只读取快照定义的列，目录中的其他文件被忽略。各列保持落盘时的dtype，
+        扫描时由操作系统按需换页，常驻内存与分块大小相当。
+        """
+        with open(os.path.join(mmap_dir, "memory_ids.json"), 'rb') as f:
+            memory_ids = orjson.loads(f.read())
+        
+        return {"memory_ids": memory_ids, **MemoryStore._open_snapshot_columns(mmap_dir)}
+    
+    @staticmethod
+    def _open_snapshot_columns(mmap_dir: str) -> Dict[str, np.ndarray]:
+        """以只读 memmap 打开快照定义的各列"""
+        return {
+            name: np.load(os.path.join(mmap_dir, f"{name}.npy"), mmap_mode='r')
+            for name in _SNAPSHOT_ARRAY_NAMES
+        }
     
     def export_to_json(self, filepath: str, user_id: Optional[str] = None):
-        """导出为JSON"""
+        """
+        导出为JSON
+        
+        逐条序列化并写入，不构造完整的字典列表与整体JSON串，
+        峰值内存与单条记忆相当
+        """
         if user_id:
-            memories = self.get_user_memories(user_id)
+            memories = self.get_user_memories(user_id, include_deleted=True)
         else:
-            memories = list(self.memories.values())
+            memories = self.memories.values()
         
-        data = [m.to_dict() for m in memories]
-        
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        with open(filepath, 'wb') as f:
+            f.write(b'[')
+            for i, memory in enumerate(memories):
+                if i:
+                    f.write(b',\n')
+                f.write(orjson.dumps(memory.to_dict()))
+            f.write(b']')
     
     def import_from_json(self, filepath: str):
-        """从JSON导入"""
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        """
+        从JSON导入
+        
+        逐条从尾部弹出已解析的记录，转换后即释放原始字典，
+        原始数据与Memory对象不会同时整体驻留内存
+        """
+        with open(filepath, 'rb') as f:
+            data = orjson.loads(f.read())
         
-        for item in data:
-            memory = Memory.from_dict(item)
-            self.add_memory(memory)
+        data.reverse()
+        from_dict = Memory.from_dict
+        add_memory = self.add_memory
+        while data:
+            add_memory(from_dict(data.pop()))
 
 
 # 使用示例
@@ -10,16 +10,103 @@
 5. 记忆溯源链：压缩后保留原始引用
 """
 
-from datetime import datetime, timedelta
-from typing import Dict, Any, Optional, List, Tuple
-from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Any, Optional, List, Tuple, Deque, Iterable, Union
+from dataclasses import dataclass, field, asdict
+from collections import deque
 from enum import Enum
+from functools import lru_cache
+import bisect
+import itertools
 import logging
 import math
+import time
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba为可选依赖，缺失时使用纯Python实现
+    njit = None
 
 logger = logging.getLogger(__name__)
 
 
+# ISO时间字符串解析缓存：提及/修正时间戳在多次衰减扫描间重复出现
+_parse_iso = lru_cache(maxsize=65536)(datetime.fromisoformat)
+
+
+def _parse_optional_ts(value: Optional[str]) -> Optional[float]:
+    """解析可能为空的ISO时间字符串为epoch秒"""
+    return _parse_iso(value).timestamp() if value else None
+
+
+# 近期提及环形缓冲容量
+RECENT_MENTIONS_MAXLEN = 64
+
+# 权重变化日志保留条数
+WEIGHT_CHANGE_LOG_MAXLEN = 50
+
+# 权重缓存令牌：每个策略实例及其每次 α 变更各取一个，避免 id() 被回收复用
+_cache_tokens = itertools.count()
+
+
+def _to_ts(value: Union[str, datetime, float]) -> float:
+    """ISO字符串 / datetime / epoch秒 → epoch秒"""
+    if isinstance(value, str):
+        return _parse_iso(value).timestamp()
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return float(value)
+
+
+def _now_ts(now: Union[datetime, float, None]) -> float:
+    """当前时刻 → epoch秒（None 表示现在）"""
+    return time.time() if now is None else _to_ts(now)
+
+
+def normalize_mentions(values: Iterable[Union[str, datetime, float]]) -> Deque[float]:
+    """将提及时间转换为升序、有界的epoch秒队列"""
+    return deque(sorted(_to_ts(v) for v in values), maxlen=RECENT_MENTIONS_MAXLEN)
+
+
+# ISO时间字段 → 缓存的epoch秒字段
+_TS_CACHE_FIELDS = {
+    "created_at": "_created_ts",
+    "last_activated_at": "_last_activated_ts",
+    "last_mention_time": "_last_mention_ts",
+}
+
+
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def _weight_kernel(
+        d_active, d_mention, d_negation, n_recent,
+        has_mention, is_negated, has_negation,
+        importance, user_factor, alpha_effective,
+        s_max, lambda_s, c_min, lambda_c, m_coef, lambda_m
+    ):
+        """W(t) 各因子的纯数值计算，返回 (w_time, S, C, M, W未约束)"""
+        w_time = 1.0 / (1.0 + alpha_effective * d_active)
+        
+        s_boost = 1.0
+        if has_mention:
+            s_boost = 1.0 + s_max * math.exp(-lambda_s * d_mention)
+        
+        c_penalty = 1.0
+        if is_negated:
+            c_penalty = c_min
+            if has_negation:
+                c_penalty = c_min + (1.0 - c_min) * math.exp(-lambda_c * d_negation)
+        
+        momentum = 1.0 + m_coef * (1.0 - math.exp(-lambda_m * n_recent))
+        
+        total = w_time * s_boost * c_penalty * importance * user_factor * momentum
+        return w_time, s_boost, c_penalty, momentum, total
+else:
+    _weight_kernel = None
+
+
 class UpdateTrigger(Enum):
     """更新触发类型"""
     PASSIVE_DECAY = "passive_decay"         # 被动衰减（定时服务）
@@ -31,7 +118,14 @@ class UpdateTrigger(Enum):
     MULTIMODAL_UPDATE = "multimodal_update"  # 跨模态更新
 
 
-class MemoryCategory(Enum):
+class _IndexedEnum(Enum):
+    """成员附带声明顺序下标 idx，用于查找表索引"""
+    
+    def __init__(self, *args):
+        self.idx = len(type(self).__members__)
+
+
+class MemoryCategory(_IndexedEnum):
     """记忆类别（影响衰减速度）"""
     IDENTITY = "identity"           # 身份信息（慢衰减）
     STABLE_PREFERENCE = "stable_preference"  # 稳定偏好
@@ -49,7 +143,7 @@ class ConflictResolution(Enum):
     WEIGHT_BALANCE = "weight_balance"  # 权重平衡（旧的逐渐衰减）
 
 
-@dataclass
+@dataclass(slots=True)
 class MemoryFactors:
     """记忆权重因子"""
     
@@ -87,7 +181,7 @@ class MemoryFactors:
         return self.total_weight
 
 
-@dataclass
+@dataclass(slots=True)
 class MemoryMetadata:
     """增强型记忆元数据"""
     
@@ -106,7 +200,7 @@ class MemoryMetadata:
     mention_count: int = 0                   # 提及次数
     reinforce_count: int = 0                 # 强化次数
     last_mention_time: Optional[str] = None  # 最后提及时间
-    recent_mentions: List[str] = field(default_factory=list)  # 近期提及时间戳
+    recent_mentions: Deque[float] = field(default_factory=deque)  # 近期提及（升序epoch秒，容量有限）
     
     # 冲突与修正
     is_negated: bool = False                 # 是否被否定
@@ -130,10 +224,55 @@ class MemoryMetadata:
     deletion_time: Optional[str] = None      # 删除时间
     
     # 可解释性
-    weight_change_log: List[Dict] = field(default_factory=list)  # 权重变化日志
+    weight_change_log: Deque[Dict] = field(default_factory=deque)  # 权重变化日志（保留最近50条）
+    
+    # epoch秒时间缓存（随ISO字段写入同步更新；ISO字符串仅作为序列化格式）
+    _created_ts: Optional[float] = field(init=False, repr=False, compare=False)
+    _last_activated_ts: Optional[float] = field(init=False, repr=False, compare=False)
+    _last_mention_ts: Optional[float] = field(init=False, repr=False, compare=False)
+    
+    # 权重缓存：同一天内元数据未变化时直接复用（任何公开字段写入都会置脏）
+    _dirty: bool = field(default=True, init=False, repr=False, compare=False)
+    _cached_weight: float = field(default=0.0, init=False, repr=False, compare=False)
+    _cached_key: Optional[Tuple] = field(default=None, init=False, repr=False, compare=False)
+    
+    def __setattr__(self, name: str, value: Any):
+        object.__setattr__(self, name, value)
+        
+        if name[0] != "_":
+            object.__setattr__(self, "_dirty", True)
+        
+        ts_name = _TS_CACHE_FIELDS.get(name)
+        if ts_name is not None:
+            object.__setattr__(self, ts_name, _parse_optional_ts(value))
+        elif name == "recent_mentions":
+            object.__setattr__(self, name, normalize_mentions(value))
+        elif name == "weight_change_log":
+            object.__setattr__(self, name, deque(value, maxlen=WEIGHT_CHANGE_LOG_MAXLEN))
+    
+    def record_mention(self, timestamp: str):
+        """记录一次用户提及"""
+        ts = _to_ts(timestamp)
+        self.mention_count += 1
+        if self._last_mention_ts is None or ts >= self._last_mention_ts:
+            self.last_mention_time = timestamp
+        
+        mentions = self.recent_mentions
+        if not mentions or ts >= mentions[-1]:
+            mentions.append(ts)
+        elif len(mentions) < RECENT_MENTIONS_MAXLEN or ts > mentions[0]:
+            # 乱序写入：保持升序，满容量时先淘汰最早的记录
+            if len(mentions) == RECENT_MENTIONS_MAXLEN:
+                mentions.popleft()
+            bisect.insort(mentions, ts)
+    
+    def record_correction(self, timestamp: str, **details: Any):
+        """追加一条修正/否定记录"""
+        self.correction_history.append({"time": timestamp, **details})
+        self._dirty = True
 
 
-@dataclass
+@dataclass(slots=True)
 class EnhancedUpdateDecision:
     """增强型更新决策"""
     
@@ -188,6 +327,12 @@ class EnhancedMemoryStrategy:
         MemoryCategory.TEMPORARY: 0.8,
     }
     
+    # 类别下标 idx → (重要性 I, 类别因子 1/I)
+    _CAT_TABLE = tuple(
+        (imp, 1.0 / imp)
+        for _, imp in sorted(IMPORTANCE_MAP.items(), key=lambda item: item[0].idx)
+    )
+    
     # 动量因子 M(t)
     M_COEF = 0.3                             # 动量系数
     LAMBDA_M = 0.5                           # 动量衰减
@@ -201,6 +346,12 @@ class EnhancedMemoryStrategy:
     FREQUENT_THRESHOLD = 3                   # N次提及视为频繁
     FREQUENT_WINDOW_HOURS = 24               # 时间窗口（小时）
     
+    # 可解释性日志开关（关闭时不构造日志条目）
+    ENABLE_CHANGE_LOG = True
+    
+    # 决策对象池容量
+    DECISION_POOL_SIZE = 32
+    
     def __init__(self, user_factor: float = 1.0):
         """
         Args:
@@ -210,12 +361,30 @@ class EnhancedMemoryStrategy:
         """
         self.user_factor = user_factor
         self.logger = logging.getLogger(__name__)
+        # 可复用的决策实例池
+        self._decision_pool: List[EnhancedUpdateDecision] = []
+    
+    @property
+    def user_factor(self) -> float:
+        """用户个性化因子 U"""
+        return self._user_factor
+    
+    @user_factor.setter
+    def user_factor(self, value: float):
+        self._user_factor = value
+        # 各类别的 α_effective = α_base × U × (1/I)，按类别下标索引
+        self._alpha_by_cat = tuple(
+            self.ALPHA_BASE * value * inv_imp
+            for _, inv_imp in self._CAT_TABLE
+        )
+        # α 变化后旧缓存全部失效
+        self._cache_token = next(_cache_tokens)
     
     def calculate_time_weight(
         self,
-        created_at: datetime,
-        last_activated_at: datetime,
-        now: Optional[datetime] = None,
+        created_at: Union[datetime, float],
+        last_activated_at: Union[datetime, float],
+        now: Union[datetime, float, None] = None,
         category: MemoryCategory = MemoryCategory.TEMPORARY
     ) -> float:
         """
@@ -224,19 +393,14 @@ class EnhancedMemoryStrategy:
         w_time(t) = 1 / (1 + α_effective * t)
         
         其中 α_effective = α_base * U * category_factor
-        """
-        if now is None:
-            now = datetime.now()
         
+        时间参数可为 datetime 或 epoch秒
+        """
         # 使用最后激活时间计算衰减
-        delta = now - last_activated_at
-        days = delta.total_seconds() / 86400
+        days = (_now_ts(now) - _to_ts(last_activated_at)) / 86400
         
-        # 类别因子（重要类别衰减慢）
-        category_factor = 1.0 / self.IMPORTANCE_MAP[category]
-        
-        # 有效衰减系数
-        alpha_effective = self.ALPHA_BASE * self.user_factor * category_factor
+        # 有效衰减系数（已含类别因子，重要类别衰减慢）
+        alpha_effective = self._alpha_by_cat[category.idx]
         
         # 时间权重
         w_time = 1.0 / (1.0 + alpha_effective * days)
@@ -245,8 +409,8 @@ class EnhancedMemoryStrategy:
     
     def calculate_semantic_boost(
         self,
-        last_mention_time: Optional[datetime],
-        now: Optional[datetime] = None
+        last_mention_time: Union[datetime, float, None],
+        now: Union[datetime, float, None] = None
     ) -> float:
         """
         计算语义强化因子
@@ -258,11 +422,7 @@ class EnhancedMemoryStrategy:
         if last_mention_time is None:
             return 1.0
         
-        if now is None:
-            now = datetime.now()
-        
-        delta = now - last_mention_time
-        days = delta.total_seconds() / 86400
+        days = (_now_ts(now) - _to_ts(last_mention_time)) / 86400
         
         boost = 1.0 + self.S_MAX * math.exp(-self.LAMBDA_S * days)
         
@@ -271,8 +431,8 @@ class EnhancedMemoryStrategy:
     def calculate_conflict_penalty(
         self,
         is_negated: bool,
-        negation_time: Optional[datetime],
-        now: Optional[datetime] = None
+        negation_time: Union[datetime, float, None],
+        now: Union[datetime, float, None] = None
     ) -> float:
         """
         计算冲突修正因子
@@ -287,20 +447,23 @@ class EnhancedMemoryStrategy:
         if negation_time is None:
             return self.C_MIN
         
-        if now is None:
-            now = datetime.now()
-        
-        delta = now - negation_time
-        days = delta.total_seconds() / 86400
+        days = (_now_ts(now) - _to_ts(negation_time)) / 86400
         
         penalty = self.C_MIN + (1.0 - self.C_MIN) * math.exp(-self.LAMBDA_C * days)
         
         return penalty
     
+    @staticmethod
+    def _count_since(recent_mentions: Iterable[Union[str, datetime, float]], cutoff_ts: float) -> int:
+        """统计 cutoff_ts 之后的提及次数（升序队列上二分查找）"""
+        if not isinstance(recent_mentions, deque):
+            recent_mentions = normalize_mentions(recent_mentions)
+        return len(recent_mentions) - bisect.bisect_left(recent_mentions, cutoff_ts)
+    
     def calculate_momentum(
         self,
-        recent_mentions: List[datetime],
-        now: Optional[datetime] = None
+        recent_mentions: Iterable[Union[str, datetime, float]],
+        now: Union[datetime, float, None] = None
     ) -> float:
         """
         计算动量/习惯因子
@@ -309,12 +472,9 @@ class EnhancedMemoryStrategy:
         
         防止短期多次提及过度放大
         """
-        if now is None:
-            now = datetime.now()
-        
         # 统计近期窗口内的提及次数
-        cutoff = now - timedelta(days=self.RECENT_WINDOW_DAYS)
-        n_recent = sum(1 for mention_time in recent_mentions if mention_time >= cutoff)
+        cutoff_ts = _now_ts(now) - self.RECENT_WINDOW_DAYS * 86400
+        n_recent = self._count_since(recent_mentions, cutoff_ts)
         
         momentum = 1.0 + self.M_COEF * (1.0 - math.exp(-self.LAMBDA_M * n_recent))
         
@@ -323,49 +483,60 @@ class EnhancedMemoryStrategy:
     def calculate_enhanced_weight(
         self,
         metadata: MemoryMetadata,
-        now: Optional[datetime] = None
+        now: Union[datetime, float, None] = None
     ) -> float:
         """
         计算增强型综合权重
         
         W(t) = w_time(t) * S(t) * C(t) * I * U * M(t)
+        
+        同一天内元数据未发生变化时直接返回上次结果（因子保持上次计算值）；
+        就地修改 correction_history 等容器后需经 record_* 方法或置 _dirty
         """
-        if now is None:
-            now = datetime.now()
+        now_ts = _now_ts(now)
         
-        # 解析时间戳
-        created_at = datetime.fromisoformat(metadata.created_at)
-        last_activated_at = datetime.fromisoformat(metadata.last_activated_at)
+        cache_key = (int(now_ts // 86400), self._cache_token)
+        if not metadata._dirty and metadata._cached_key == cache_key:
+            return metadata._cached_weight
         
-        # 基础时间权重
+        if _weight_kernel is not None:
+            total = self._calculate_enhanced_weight_jit(metadata, now_ts)
+        else:
+            total = self._calculate_enhanced_weight_py(metadata, now_ts)
+        
+        metadata._cached_weight = total
+        metadata._cached_key = cache_key
+        metadata._dirty = False
+        
+        return total
+    
+    def _calculate_enhanced_weight_py(
+        self,
+        metadata: MemoryMetadata,
+        now_ts: float
+    ) -> float:
+        """calculate_enhanced_weight 的纯Python实现"""
+        # 基础时间权重（时间戳取自元数据epoch秒缓存）
         w_time = self.calculate_time_weight(
-            created_at, last_activated_at, now, metadata.category
+            metadata._created_ts, metadata._last_activated_ts, now_ts, metadata.category
         )
         
         # 语义强化
-        last_mention = None
-        if metadata.last_mention_time:
-            last_mention = datetime.fromisoformat(metadata.last_mention_time)
-        s_boost = self.calculate_semantic_boost(last_mention, now)
+        s_boost = self.calculate_semantic_boost(metadata._last_mention_ts, now_ts)
         
         # 冲突惩罚
-        negation_time = None
+        negation_ts = None
         if metadata.is_negated and metadata.correction_history:
-            negation_time = datetime.fromisoformat(
-                metadata.correction_history[-1]["time"]
-            )
+            negation_ts = _to_ts(metadata.correction_history[-1]["time"])
         c_penalty = self.calculate_conflict_penalty(
-            metadata.is_negated, negation_time, now
+            metadata.is_negated, negation_ts, now_ts
         )
         
         # 重要性
-        importance = self.IMPORTANCE_MAP[metadata.category]
+        importance = self._CAT_TABLE[metadata.category.idx][0]
         
         # 动量
-        recent_mentions = [
-            datetime.fromisoformat(ts) for ts in metadata.recent_mentions
-        ]
-        momentum = self.calculate_momentum(recent_mentions, now)
+        momentum = self.calculate_momentum(metadata.recent_mentions, now_ts)
         
         # 更新因子
         metadata.factors.time_weight = w_time
@@ -383,22 +554,212 @@ class EnhancedMemoryStrategy:
         
         return total
     
+    def _calculate_enhanced_weight_jit(
+        self,
+        metadata: MemoryMetadata,
+        now_ts: float
+    ) -> float:
+        """calculate_enhanced_weight 的Numba实现：Python侧只准备天数与计数"""
+        d_active = (now_ts - metadata._last_activated_ts) / 86400
+        
+        last_mention = metadata._last_mention_ts
+        d_mention = 0.0
+        if last_mention is not None:
+            d_mention = (now_ts - last_mention) / 86400
+        
+        negation_ts = None
+        if metadata.is_negated and metadata.correction_history:
+            negation_ts = _to_ts(metadata.correction_history[-1]["time"])
+        d_negation = 0.0
+        if negation_ts is not None:
+            d_negation = (now_ts - negation_ts) / 86400
+        
+        cutoff_ts = now_ts - self.RECENT_WINDOW_DAYS * 86400
+        n_recent = self._count_since(metadata.recent_mentions, cutoff_ts)
+        
+        cat_idx = metadata.category.idx
+        importance = self._CAT_TABLE[cat_idx][0]
+        
+        w_time, s_boost, c_penalty, momentum, total = _weight_kernel(
+            d_active, d_mention, d_negation, n_recent,
+            last_mention is not None, metadata.is_negated, negation_ts is not None,
+            importance, self.user_factor, self._alpha_by_cat[cat_idx],
+            self.S_MAX, self.LAMBDA_S,
+            self.C_MIN, self.LAMBDA_C, self.M_COEF, self.LAMBDA_M
+        )
+        
+        factors = metadata.factors
+        factors.time_weight = w_time
+        factors.semantic_boost = s_boost
+        factors.conflict_penalty = c_penalty
+        factors.importance = importance
+        factors.user_factor = self.user_factor
+        factors.momentum = momentum
+        factors.total_weight = total
+        
+        return max(self.WEIGHT_MIN, min(total, self.WEIGHT_MAX))
+    
+    def calculate_enhanced_weight_batch(
+        self,
+        metadatas: List[MemoryMetadata],
+        now: Union[datetime, float, None] = None
+    ) -> np.ndarray:
+        """
+        批量计算增强型综合权重（被动衰减扫描）
+        
+        将时间戳抽取为数组后一次性向量化计算各因子，结果与逐条调用
+        calculate_enhanced_weight 一致，并同样写回各条 metadata.factors
+        
+        Returns:
+            边界约束后的综合权重数组
+        """
+        now_ts = _now_ts(now)
+        
+        n = len(metadatas)
+        last_activated = np.empty(n, dtype=np.float64)
+        last_mention = np.full(n, np.nan, dtype=np.float64)
+        negation = np.full(n, np.nan, dtype=np.float64)
+        is_negated = np.zeros(n, dtype=np.bool_)
+        importance = np.empty(n, dtype=np.float64)
+        alpha_effective = np.empty(n, dtype=np.float64)
+        mention_ts: List[float] = []
+        mention_rows: List[int] = []
+        
+        for i, metadata in enumerate(metadatas):
+            last_activated[i] = metadata._last_activated_ts
+            if metadata._last_mention_ts is not None:
+                last_mention[i] = metadata._last_mention_ts
+            if metadata.is_negated:
+                is_negated[i] = True
+                if metadata.correction_history:
+                    negation[i] = _to_ts(metadata.correction_history[-1]["time"])
+            cat_idx = metadata.category.idx
+            importance[i] = self._CAT_TABLE[cat_idx][0]
+            alpha_effective[i] = self._alpha_by_cat[cat_idx]
+            mention_ts.extend(metadata.recent_mentions)
+            mention_rows.extend([i] * len(metadata.recent_mentions))
+        
+        # 基础时间权重
+        days = (now_ts - last_activated) / 86400
+        w_time = 1.0 / (1.0 + alpha_effective * days)
+        
+        # 语义强化
+        s_boost = np.where(
+            np.isnan(last_mention),
+            1.0,
+            1.0 + self.S_MAX * np.exp(-self.LAMBDA_S * (now_ts - last_mention) / 86400)
+        )
+        
+        # 冲突惩罚
+        c_penalty = np.where(
+            is_negated,
+            np.where(
+                np.isnan(negation),
+                self.C_MIN,
+                self.C_MIN + (1.0 - self.C_MIN) * np.exp(-self.LAMBDA_C * (now_ts - negation) / 86400)
+            ),
+            1.0
+        )
+        
+        # 动量：近期窗口内提及次数
+        cutoff_ts = now_ts - self.RECENT_WINDOW_DAYS * 86400
+        in_window = np.asarray(mention_ts, dtype=np.float64) >= cutoff_ts
+        n_recent = np.bincount(
+            np.asarray(mention_rows, dtype=np.int64)[in_window],
+            minlength=n
+        )
+        momentum = 1.0 + self.M_COEF * (1.0 - np.exp(-self.LAMBDA_M * n_recent))
+        
+        total = w_time * s_boost * c_penalty * importance * self.user_factor * momentum
+        
+        # 边界约束
+        clipped = np.clip(total, self.WEIGHT_MIN, self.WEIGHT_MAX)
+        
+        # 写回因子与权重缓存
+        cache_key = (int(now_ts // 86400), self._cache_token)
+        for i, metadata in enumerate(metadatas):
+            factors = metadata.factors
+            factors.time_weight = float(w_time[i])
+            factors.semantic_boost = float(s_boost[i])
+            factors.conflict_penalty = float(c_penalty[i])
+            factors.importance = float(importance[i])
+            factors.user_factor = self.user_factor
+            factors.momentum = float(momentum[i])
+            factors.total_weight = float(total[i])
+            metadata._cached_weight = float(clipped[i])
+            metadata._cached_key = cache_key
+            metadata._dirty = False
+        
+        return clipped
+    
     def detect_frequent_reinforce(
         self,
-        recent_mentions: List[str],
-        now: Optional[datetime] = None
+        recent_mentions: Iterable[Union[str, datetime, float]],
+        now: Union[datetime, float, None] = None
     ) -> bool:
-        """检测频繁强化"""
-        if now is None:
-            now = datetime.now()
-        
-        cutoff = now - timedelta(hours=self.FREQUENT_WINDOW_HOURS)
-        recent = [
-            datetime.fromisoformat(ts) for ts in recent_mentions
-            if datetime.fromisoformat(ts) >= cutoff
-        ]
+        """
+        检测频繁强化
         
-        return len(recent) >= self.FREQUENT_THRESHOLD
+        总提及数不足阈值时直接返回；升序队列只需检查倒数第 threshold 条
+        是否落在窗口内，其他序列逐条计数并在达到阈值时提前返回
+        """
+        threshold = self.FREQUENT_THRESHOLD
+        if len(recent_mentions) < threshold:
+            return False
+        
+        cutoff_ts = _now_ts(now) - self.FREQUENT_WINDOW_HOURS * 3600
+        if isinstance(recent_mentions, deque):
+            return recent_mentions[-threshold] >= cutoff_ts
+        
+        count = 0
+        for mention in recent_mentions:
+            if _to_ts(mention) >= cutoff_ts:
+                count += 1
+                if count >= threshold:
+                    return True
+        return False
+    
+    def _acquire_decision(self) -> EnhancedUpdateDecision:
+        """从对象池取出决策实例（池空时新建）"""
+        if self._decision_pool:
+            return self._decision_pool.pop()
+        return EnhancedUpdateDecision(
+            action="",
+            should_refresh_timestamp=False,
+            should_upgrade_level=False
+        )
+    
+    def release_decision(self, decision: EnhancedUpdateDecision):
+        """归还不再持有的决策实例，供后续决策复用"""
+        if len(self._decision_pool) < self.DECISION_POOL_SIZE:
+            self._decision_pool.append(decision)
+    
+    @staticmethod
+    def _fill_decision(
+        out: EnhancedUpdateDecision,
+        action: str,
+        should_refresh_timestamp: bool,
+        should_upgrade_level: bool,
+        reason: str,
+        semantic_boost_delta: float = 0.0,
+        conflict_penalty_delta: float = 0.0,
+        momentum_delta: float = 0.0,
+        mark_as_negated: bool = False
+    ) -> EnhancedUpdateDecision:
+        """重置并写入决策的全部字段"""
+        out.action = action
+        out.should_refresh_timestamp = should_refresh_timestamp
+        out.should_upgrade_level = should_upgrade_level
+        out.semantic_boost_delta = semantic_boost_delta
+        out.conflict_penalty_delta = conflict_penalty_delta
+        out.momentum_delta = momentum_delta
+        out.mark_as_negated = mark_as_negated
+        out.mark_as_corrected = False
+        out.merge_targets.clear()
+        out.reason = reason
+        out.similarity_score = 0.0
+        out.confidence = 1.0
+        return out
     
     def decide_enhanced_action(
         self,
@@ -419,15 +780,34 @@ class EnhancedMemoryStrategy:
             similarity_score: 语义相似度
             is_negation: 是否为否定/修正
             now: 当前时间
-        """
-        if now is None:
-            now = datetime.now()
         
-        metadata = old_memory.get("metadata", {})
+        用完后可通过 release_decision() 归还实例
+        """
+        return self.decide_enhanced_action_into(
+            self._acquire_decision(), trigger, old_memory, new_content,
+            similarity_score, is_negation, now
+        )
+    
+    def decide_enhanced_action_into(
+        self,
+        out: EnhancedUpdateDecision,
+        trigger: UpdateTrigger,
+        old_memory: Dict[str, Any],
+        new_content: str,
+        similarity_score: float = 0.0,
+        is_negation: bool = False,
+        now: Optional[datetime] = None
+    ) -> EnhancedUpdateDecision:
+        """
+        增强型决策引擎（写入调用方提供的决策实例）
         
+        循环中复用同一个 out 可避免每次决策分配新对象；
+        当前时间与近期提及仅在前两种情况未命中时才读取
+        """
         # 🧩 情况1：被动压缩
         if trigger == UpdateTrigger.PASSIVE_DECAY:
-            return EnhancedUpdateDecision(
+            return self._fill_decision(
+                out,
                 action="compress",
                 should_refresh_timestamp=False,  # ✅ 不刷新
                 should_upgrade_level=False,
@@ -436,7 +816,8 @@ class EnhancedMemoryStrategy:
         
         # 🧩 情况2：用户否定/修正
         if trigger == UpdateTrigger.USER_NEGATION or is_negation:
-            return EnhancedUpdateDecision(
+            return self._fill_decision(
+                out,
                 action="negate",
                 should_refresh_timestamp=False,  # 旧记忆不刷新
                 should_upgrade_level=False,
@@ -445,10 +826,11 @@ class EnhancedMemoryStrategy:
                 reason=f"用户否定/修正，旧记忆降权（相似度{similarity_score:.2f}）"
             )
         
-        # 🧩 情况3：频繁强化
-        recent_mentions = metadata.get("recent_mentions", [])
+        # 🧩 情况3：频繁强化（优先于相似度判断）
+        recent_mentions = old_memory.get("metadata", {}).get("recent_mentions", ())
         if self.detect_frequent_reinforce(recent_mentions, now):
-            return EnhancedUpdateDecision(
+            return self._fill_decision(
+                out,
                 action="merge",
                 should_refresh_timestamp=True,
                 should_upgrade_level=True,
@@ -459,7 +841,8 @@ class EnhancedMemoryStrategy:
         
         # 🧩 情况4：高相似度 → 合并更新
         if similarity_score >= self.HIGH_SIMILARITY:
-            return EnhancedUpdateDecision(
+            return self._fill_decision(
+                out,
                 action="merge",
                 should_refresh_timestamp=True,   # ✅ 刷新
                 should_upgrade_level=True,
@@ -469,7 +852,8 @@ class EnhancedMemoryStrategy:
         
         # 🧩 情况5：中等相似度 → 保留双轨
         if similarity_score >= self.MEDIUM_SIMILARITY:
-            return EnhancedUpdateDecision(
+            return self._fill_decision(
+                out,
                 action="keep_both",
                 should_refresh_timestamp=False,  # 旧的不刷新
                 should_upgrade_level=False,
@@ -477,7 +861,8 @@ class EnhancedMemoryStrategy:
             )
         
         # 🧩 情况6：低相似度 → 新建独立
-        return EnhancedUpdateDecision(
+        return self._fill_decision(
+            out,
             action="create_new",
             should_refresh_timestamp=False,      # 旧的不刷新
             should_upgrade_level=False,
@@ -497,15 +882,24 @@ class EnhancedMemoryStrategy:
         if not memories:
             return {}
         
-        # 选择最新的作为基准
-        base = max(memories, key=lambda m: m["metadata"]["last_activated_at"])
+        # 单次遍历：选择最新的作为基准，同时累加提及次数
+        base = None
+        best_ts = float("-inf")
+        total_mentions = 0
+        for m in memories:
+            md = m["metadata"]
+            ts = _to_ts(md["last_activated_at"])
+            if ts > best_ts:
+                best_ts = ts
+                base = m
+            total_mentions += md.get("mention_count", 1)
         
         merged = {
             "memory": self._summarize_batch([m["memory"] for m in memories]),
             "metadata": {
                 **base["metadata"],
                 "merged_from": [m["id"] for m in memories if m["id"] != base["id"]],
-                "mention_count": sum(m["metadata"].get("mention_count", 1) for m in memories),
+                "mention_count": total_mentions,
                 "last_activated_at": datetime.now().isoformat()
             }
         }
@@ -527,6 +921,9 @@ class EnhancedMemoryStrategy:
         reason: str
     ):
         """记录权重变化（可解释性）"""
+        if not self.ENABLE_CHANGE_LOG:
+            return
+        
         log_entry = {
             "time": datetime.now().isoformat(),
             "old_weight": round(old_weight, 4),
@@ -542,11 +939,8 @@ class EnhancedMemoryStrategy:
             }
         }
         
+        # 有界队列自动淘汰最旧条目
         metadata.weight_change_log.append(log_entry)
-        
-        # 保留最近50条
-        if len(metadata.weight_change_log) > 50:
-            metadata.weight_change_log = metadata.weight_change_log[-50:]
 
 
 # 使用示例
@@ -573,8 +967,7 @@ if __name__ == "__main__":
     
     # 模拟用户提及（激活）
     metadata.last_activated_at = "2024-01-31T10:00:00"
-    metadata.last_mention_time = "2024-01-31T10:00:00"
-    metadata.recent_mentions.append("2024-01-31T10:00:00")
+    metadata.record_mention("2024-01-31T10:00:00")
     
     weight = strategy.calculate_enhanced_weight(metadata, now)
     print(f"激活后权重: {weight:.4f}")
@@ -582,7 +975,7 @@ if __name__ == "__main__":
     # 决策测试
     decision = strategy.decide_enhanced_action(
         trigger=UpdateTrigger.USER_MENTION,
-        old_memory={"metadata": metadata.__dict__},
+        old_memory={"metadata": asdict(metadata)},
         new_content="我还是喜欢咖啡",
         similarity_score=0.92
     )
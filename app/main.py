@@ -1,19 +1,68 @@
+import asyncio
+import functools
+import logging
 import os
-import re
+import queue
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+import numpy as np
 import uvicorn
 from fastapi import FastAPI, HTTPException, BackgroundTasks
-from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ConfigDict
+from typing import List, Optional, Dict, Any, Set, Tuple
 from mem0 import Memory
+import orjson
+
+# Log records are queued and written to stderr by a listener thread, so
+# request and worker threads never block on the stream.
+logger = logging.getLogger("mem0api")
+logger.setLevel(logging.INFO)
+logger.propagate = False
+_log_queue = queue.Queue(-1)
+logger.addHandler(QueueHandler(_log_queue))
+_log_stream_handler = logging.StreamHandler()
+_log_stream_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+_log_listener = QueueListener(_log_queue, _log_stream_handler)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Start Mem0 initialization in the background and return immediately, so the
+    server accepts requests (and /health reports "initializing") while Qdrant
+    and the LLM/embedding providers are still being contacted. Failed attempts
+    are retried with backoff, so a transient outage doesn't leave the server
+    permanently degraded.
+    """
+    _log_listener.start()
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=MEM0_THREAD_POOL_SIZE, thread_name_prefix="mem0")
+    )
+    init_task = asyncio.create_task(initialize_mem0_with_retry())
+    await startup_maintenance()
+    yield
+    init_task.cancel()
+    _log_listener.stop()
 
 # Initialize FastAPI app
-app = FastAPI(title="Mem0 API Server", description="Custom Mem0 Deployment with Zhipu AI and ModelArk")
+app = FastAPI(
+    title="Mem0 API Server",
+    description="Custom Mem0 Deployment with Zhipu AI and ModelArk",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
+)
 
 # ============= Configuration with environment variable support =============
 
 # Vector Store Configuration
 QDRANT_HOST = os.getenv("QDRANT_HOST", "115.190.24.157")
 QDRANT_PORT = int(os.getenv("QDRANT_PORT", "6333"))
+# Apply int8 scalar quantization to the Mem0 collection at startup
+QDRANT_INT8_QUANTIZATION = os.getenv("QDRANT_INT8_QUANTIZATION", "false").lower() == "true"
 
 # LLM Configuration (Zhipu AI)
 LLM_PROVIDER = os.getenv("LLM_PROVIDER", "openai")
@@ -32,17 +81,74 @@ EMBEDDING_BASE_URL = os.getenv("EMBEDDING_BASE_URL", "https://ai.gitee.com/v1")
 ZHIPU_API_KEY = os.getenv("ZHIPU_API_KEY", "your_zhipu_key")
 MODELARK_API_KEY = os.getenv("MODELARK_API_KEY", "your_modelark_key")
 
+# Search Result Cache (size 0 disables it)
+SEARCH_CACHE_SIZE = int(os.getenv("SEARCH_CACHE_SIZE", "1024"))
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", "300"))
+
+# Semantic Search Cache (threshold 0 disables it): answer a search with the
+# cached result of an earlier query whose embedding has at least this cosine
+# similarity, within the same user/agent/run, limit and filters
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0"))
+SEMANTIC_CACHE_SIZE = int(os.getenv("SEMANTIC_CACHE_SIZE", "256"))
+
+# Add Replay Cache (size 0 disables it): an identical /memories POST (same
+# owner, language, metadata and messages) within the TTL returns the earlier
+# result instead of repeating fact extraction and embedding, e.g. on retries
+ADD_REPLAY_CACHE_SIZE = int(os.getenv("ADD_REPLAY_CACHE_SIZE", "0"))
+ADD_REPLAY_TTL = float(os.getenv("ADD_REPLAY_TTL", "60"))
+
+# Upper bound (seconds) of the backoff between failed Mem0 initialization attempts
+MEM0_INIT_RETRY_MAX_DELAY = float(os.getenv("MEM0_INIT_RETRY_MAX_DELAY", "60"))
+
+# Worker threads for blocking Mem0 calls (asyncio.to_thread); caps the number
+# of concurrent LLM/embedding/Qdrant round-trips per process
+MEM0_THREAD_POOL_SIZE = int(os.getenv("MEM0_THREAD_POOL_SIZE", "32"))
+
+# Add Request Micro-batching (window 0 disables it)
+ADD_BATCH_WINDOW_MS = float(os.getenv("ADD_BATCH_WINDOW_MS", "0"))
+ADD_BATCH_MAX_SIZE = int(os.getenv("ADD_BATCH_MAX_SIZE", "8"))
+
 # ============= Language Detection and Adaptive Prompts =============
 
-# Language detection patterns
-LANGUAGE_PATTERNS = {
-    'zh': re.compile(r'[\u4e00-\u9fff]'),  # Chinese characters
-    'ja': re.compile(r'[\u3040-\u309f\u30a0-\u30ff]'),  # Japanese hiragana/katakana
-    'ko': re.compile(r'[\uac00-\ud7af]'),  # Korean Hangul
-    'ar': re.compile(r'[\u0600-\u06ff]'),  # Arabic
-    'ru': re.compile(r'[а-яА-ЯёЁ]'),  # Russian Cyrillic
-    'th': re.compile(r'[\u0e00-\u0e7f]'),  # Thai
-}
+# Language detection: code point ranges per language
+LANGUAGE_CODEPOINT_RANGES = (
+    ('zh', 0x4e00, 0x9fff),  # Chinese characters
+    ('ja', 0x3040, 0x30ff),  # Japanese hiragana/katakana
+    ('ko', 0xac00, 0xd7af),  # Korean Hangul
+    ('ar', 0x0600, 0x06ff),  # Arabic
+    ('ru', 0x0410, 0x044f),  # Russian Cyrillic а-я / А-Я
+    ('ru', 0x0401, 0x0401),  # Ё
+    ('ru', 0x0451, 0x0451),  # ё
+    ('th', 0x0e00, 0x0e7f),  # Thai
+)
+
+# Detectable languages in declaration order (ties resolve to the earlier one)
+DETECTABLE_LANGUAGES = tuple(dict.fromkeys(lang for lang, _, _ in LANGUAGE_CODEPOINT_RANGES))
+
+# BMP lookup table: code point -> index into DETECTABLE_LANGUAGES, or
+# len(DETECTABLE_LANGUAGES) for "no language". All ranges lie in the BMP, so
+# code points above it are clamped onto U+FFFF, which maps to "no language".
+_LANGUAGE_LUT = np.full(0x10000, len(DETECTABLE_LANGUAGES), dtype=np.uint8)
+for _lang, _lo, _hi in LANGUAGE_CODEPOINT_RANGES:
+    _LANGUAGE_LUT[_lo:_hi + 1] = DETECTABLE_LANGUAGES.index(_lang)
+
+# Below this length a per-character loop over a bytes copy of the table beats
+# the fixed overhead of the numpy path
+LANGUAGE_SCALAR_SCAN_MAX_CHARS = 24
+_LANGUAGE_LUT_BYTES = _LANGUAGE_LUT.tobytes()
+
+# Every range lies above ASCII, so pure-ASCII text scores zero everywhere
+_NO_LANGUAGE_CHARS = np.zeros(len(DETECTABLE_LANGUAGES), dtype=np.intp)
+_NO_LANGUAGE_CHARS.flags.writeable = False
+
+# Conversation language detection only looks at a prefix of the messages:
+# at most this many characters, stopping early once one language has
+# LANGUAGE_DETECT_CONFIDENCE characters
+LANGUAGE_DETECT_MAX_CHARS = 512
+LANGUAGE_DETECT_CONFIDENCE = 20
+# Distinct texts (each at most LANGUAGE_DETECT_MAX_CHARS long) whose
+# character counts are memoized
+LANGUAGE_DETECT_CACHE_SIZE = 4096
 
 LANGUAGE_PROMPTS = {
     'zh': """提取以下中文内容中的关键事实。重要：所有事实必须用中文写出！
@@ -100,33 +206,97 @@ Requirements:
 """,
 }
 
-def detect_language(text: str) -> str:
+def detect_language(text: str, max_chars: int = LANGUAGE_DETECT_MAX_CHARS) -> str:
     """
-    Detect the language of input text based on character patterns.
+    Detect the language of input text based on character code point ranges.
+    Only the first max_chars characters are examined.
     Returns language code: 'zh', 'en', 'ja', 'ko', 'ar', 'ru', 'th', etc.
     Default to 'en' if no specific pattern matches.
     """
     if not text or not isinstance(text, str):
         return 'en'
     
-    # Count character occurrences for each language
-    language_scores = {}
-    for lang, pattern in LANGUAGE_PATTERNS.items():
-        matches = len(pattern.findall(text))
-        if matches > 0:
-            language_scores[lang] = matches
-    
-    # Return the language with the most matches
-    if language_scores:
-        detected_lang = max(language_scores, key=language_scores.get)
-        return detected_lang
+    return _pick_language(_count_language_chars(text[:max_chars]))
+
+def detect_language_from_messages(
+    messages: List["Message"],
+    max_chars: int = LANGUAGE_DETECT_MAX_CHARS,
+    confidence: int = LANGUAGE_DETECT_CONFIDENCE
+) -> str:
+    """
+    Detect the language of a conversation from a prefix of its messages.
+    Messages are counted in order without joining them; counting stops after
+    max_chars characters, or as soon as one language reaches `confidence`.
+    """
+    language_scores = np.zeros(len(DETECTABLE_LANGUAGES), dtype=np.intp)
+    remaining = max_chars
+    for msg in messages:
+        if remaining <= 0:
+            break
+        content = msg.content[:remaining]
+        remaining -= len(content)
+        language_scores += _count_language_chars(content)
+        if language_scores.max() >= confidence:
+            break
     
-    # Default to English if no specific pattern matches
+    return _pick_language(language_scores)
+
+def _count_language_chars(text: str) -> np.ndarray:
+    """
+    Count character occurrences for each language (indexed like
+    DETECTABLE_LANGUAGES): one table lookup per code point over the UTF-32
+    buffer, then a histogram. Pure-ASCII text skips the scan, and short text
+    is counted in a plain loop.
+    """
+    if text.isascii():
+        return _NO_LANGUAGE_CHARS
+    if len(text) < LANGUAGE_SCALAR_SCAN_MAX_CHARS:
+        no_language = len(DETECTABLE_LANGUAGES)
+        counts = [0] * (no_language + 1)
+        for ch in text:
+            cp = ord(ch)
+            counts[_LANGUAGE_LUT_BYTES[cp] if cp < 0x10000 else no_language] += 1
+        return np.array(counts[:no_language], dtype=np.intp)
+    return _scan_language_chars(text)
+
+@functools.lru_cache(maxsize=LANGUAGE_DETECT_CACHE_SIZE)
+def _scan_language_chars(text: str) -> np.ndarray:
+    """
+    Vectorized counting for _count_language_chars. Memoized, since clients
+    often resend the same greetings, prompts and retried messages; the
+    returned (shared) arrays are read-only.
+    """
+    codepoints = np.frombuffer(text.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+    language_indices = _LANGUAGE_LUT[np.minimum(codepoints, 0xffff)]
+    language_scores = np.bincount(language_indices, minlength=len(DETECTABLE_LANGUAGES) + 1)
+    language_scores = language_scores[:len(DETECTABLE_LANGUAGES)]
+    language_scores.flags.writeable = False
+    return language_scores
+
+def _pick_language(language_scores: np.ndarray) -> str:
+    """Return the language with the most matches, defaulting to English."""
+    if language_scores.any():
+        return DETECTABLE_LANGUAGES[int(language_scores.argmax())]
     return 'en'
 
+_DEFAULT_SYSTEM_PROMPT = LANGUAGE_PROMPTS['en']
+
 def get_system_prompt(language: str) -> str:
     """Get the system prompt for a specific language."""
-    return LANGUAGE_PROMPTS.get(language, LANGUAGE_PROMPTS['en'])
+    return LANGUAGE_PROMPTS.get(language, _DEFAULT_SYSTEM_PROMPT)
+
+# Static per-language prefix of the first enhanced message (system prompt +
+# input label). Built once at import; keeping the prefix byte-identical across
+# requests also lets the LLM provider's prompt cache reuse it.
+ENHANCED_PROMPT_PREFIXES = {
+    lang: f"{prompt}\n\n[{'用户输入' if lang == 'zh' else 'User Input'}]\n"
+    for lang, prompt in LANGUAGE_PROMPTS.items()
+}
+_DEFAULT_PROMPT_PREFIX = ENHANCED_PROMPT_PREFIXES['en']
+
+def get_enhanced_prompt_prefix(language: str) -> str:
+    """Get the enhanced-message prefix for a specific language."""
+    return ENHANCED_PROMPT_PREFIXES.get(language, _DEFAULT_PROMPT_PREFIX)
 
 # ============= Build Mem0 Configuration Dictionary =============
 config = {
@@ -162,29 +332,72 @@ config = {
 # Initialize Mem0 (non-blocking startup)
 m = None
 initialization_error = None
+# Whether the Mem0 client exposes get_all; probed once per initialization
+_HAS_GET_ALL = False
 
 def initialize_mem0():
-    global m, initialization_error
+    global m, initialization_error, _HAS_GET_ALL
     try:
-        print(f"Initializing Mem0 with config...")
-        print(f"  - Qdrant Host: {QDRANT_HOST}:{QDRANT_PORT}")
-        print(f"  - LLM Provider: {LLM_PROVIDER} | Model: {LLM_MODEL} | URL: {LLM_BASE_URL}")
-        print(f"  - LLM Temperature: {LLM_TEMPERATURE} | Max Tokens: {LLM_MAX_TOKENS}")
-        print(f"  - Embedder Provider: {EMBEDDING_PROVIDER} | Model: {EMBEDDING_MODEL}")
-        print(f"  - Embedding Dims: {EMBEDDING_DIMS} | URL: {EMBEDDING_BASE_URL}")
+        logger.info("Initializing Mem0 with config...")
+        logger.info(f"  - Qdrant Host: {QDRANT_HOST}:{QDRANT_PORT}")
+        logger.info(f"  - LLM Provider: {LLM_PROVIDER} | Model: {LLM_MODEL} | URL: {LLM_BASE_URL}")
+        logger.info(f"  - LLM Temperature: {LLM_TEMPERATURE} | Max Tokens: {LLM_MAX_TOKENS}")
+        logger.info(f"  - Embedder Provider: {EMBEDDING_PROVIDER} | Model: {EMBEDDING_MODEL}")
+        logger.info(f"  - Embedding Dims: {EMBEDDING_DIMS} | URL: {EMBEDDING_BASE_URL}")
         
         m = Memory.from_config(config)
-        print("✓ Mem0 initialized successfully with custom config.")
+        _HAS_GET_ALL = hasattr(m, 'get_all')
+        logger.info("✓ Mem0 initialized successfully with custom config.")
         initialization_error = None
+        
+        if QDRANT_INT8_QUANTIZATION:
+            try:
+                collection_name = quantize_qdrant_collection()
+                logger.info(f"✓ Enabled int8 quantization for Qdrant collection {collection_name}.")
+            except Exception as e:
+                logger.error(f"✗ Failed to enable int8 quantization: {e}")
     except Exception as e:
-        print(f"✗ Error initializing Mem0: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception(f"✗ Error initializing Mem0: {e}")
         initialization_error = str(e)
         m = None
 
-# Try to initialize at startup
-initialize_mem0()
+async def initialize_mem0_with_retry():
+    """Run initialize_mem0 until it succeeds, backing off exponentially between attempts."""
+    delay = 1.0
+    while True:
+        await asyncio.to_thread(initialize_mem0)
+        if m is not None:
+            return
+        logger.info(f"Retrying Mem0 initialization in {delay:.0f}s")
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, MEM0_INIT_RETRY_MAX_DELAY)
+
+def quantize_qdrant_collection(collection_name: Optional[str] = None) -> str:
+    """
+    Enable int8 scalar quantization on a Qdrant collection (default: the one
+    Mem0 uses). Quantized vectors stay in RAM for search, while the original
+    float32 vectors and the HNSW graph move to disk and are only read for
+    rescoring, cutting vector-store RAM roughly 4x.
+    """
+    from qdrant_client import QdrantClient, models
+    
+    if collection_name is None:
+        collection_name = getattr(getattr(m, "vector_store", None), "collection_name", None) or "mem0"
+    
+    client = QdrantClient(host=QDRANT_HOST, port=QDRANT_PORT)
+    client.update_collection(
+        collection_name=collection_name,
+        vectors_config={"": models.VectorParamsDiff(on_disk=True)},
+        hnsw_config=models.HnswConfigDiff(on_disk=True),
+        quantization_config=models.ScalarQuantization(
+            scalar=models.ScalarQuantizationConfig(
+                type=models.ScalarType.INT8,
+                quantile=0.99,
+                always_ram=True
+            )
+        )
+    )
+    return collection_name
 
 # Pydantic Models
 class Message(BaseModel):
@@ -192,12 +405,19 @@ class Message(BaseModel):
     content: str
 
 class AddMemoryRequest(BaseModel):
+    model_config = ConfigDict(ignored_types=(functools.cached_property,))
+    
     messages: List[Message]
     user_id: Optional[str] = None
     agent_id: Optional[str] = None
     run_id: Optional[str] = None
     metadata: Optional[Dict[str, Any]] = None
     language: Optional[str] = None  # Auto-detected if not provided
+    
+    @functools.cached_property
+    def messages_as_dicts(self) -> List[Dict[str, str]]:
+        """Plain-dict messages for m.add, built once per request."""
+        return [{"role": msg.role, "content": msg.content} for msg in self.messages]
 
 class SearchMemoryRequest(BaseModel):
     query: str
@@ -210,6 +430,175 @@ class SearchMemoryRequest(BaseModel):
 class MemoryResponse(BaseModel):
     results: List[Dict[str, Any]]
 
+# ============= Search Result Cache =============
+
+class SearchResultCache:
+    """
+    Bounded LRU cache of search results with a TTL.
+    
+    Repeated identical searches are answered without the embedder + Qdrant
+    round-trip. Any write (add/delete/reset) invalidates the whole cache and
+    bumps `generation`; a search that started under an older generation does
+    not store its result, so a write racing with a search can't leave stale
+    results behind. Only read-only searches are cached, never writes.
+    """
+    
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.generation = 0
+        self._entries: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+    
+    def get(self, key: Tuple) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, result = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return result
+    
+    def put(self, key: Tuple, result: Any, generation: int):
+        if self.maxsize <= 0 or generation != self.generation:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, result)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+    
+    def invalidate(self):
+        self.generation += 1
+        self._entries.clear()
+
+search_cache = SearchResultCache(SEARCH_CACHE_SIZE, SEARCH_CACHE_TTL)
+# Same LRU/TTL/generation mechanics for replayed adds; invalidated by deletes
+add_replay_cache = SearchResultCache(ADD_REPLAY_CACHE_SIZE, ADD_REPLAY_TTL)
+
+class SemanticSearchCache:
+    """
+    Near-duplicate query cache in front of Mem0 search.
+    
+    Entries are grouped by scope (every search parameter except the query);
+    each scope keeps its unit-normalized query embeddings stacked in one
+    float32 matrix, so a lookup is a single matrix-vector product. At most
+    `maxsize` entries are kept; on overflow the oldest entries of the least
+    recently used scope are evicted first. Entries expire with the exact-match
+    cache TTL (expired rows of a scope are pruned whenever it is touched) and
+    are dropped whenever `search_cache` is invalidated (checked lazily through
+    its generation).
+    """
+    
+    def __init__(self, exact_cache: SearchResultCache, maxsize: int, threshold: float):
+        self.exact_cache = exact_cache
+        self.maxsize = maxsize
+        self.threshold = threshold
+        self._generation = exact_cache.generation
+        self._size = 0
+        # scope -> (vectors (n, dims), [(expires_at, result), ...])
+        self._scopes: "OrderedDict[Tuple, Tuple[np.ndarray, List[Tuple[float, Any]]]]" = OrderedDict()
+    
+    @property
+    def enabled(self) -> bool:
+        return self.threshold > 0 and self.maxsize > 0
+    
+    def _sync_generation(self):
+        if self._generation != self.exact_cache.generation:
+            self._generation = self.exact_cache.generation
+            self._scopes.clear()
+            self._size = 0
+    
+    @staticmethod
+    def normalize(vector) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+    
+    def _drop_expired(self, scope: Tuple, now: float):
+        """Prune expired rows of a scope; returns the remaining entry or None."""
+        entry = self._scopes.get(scope)
+        if entry is None:
+            return None
+        vectors, results = entry
+        live = [i for i, (expires_at, _) in enumerate(results) if expires_at >= now]
+        if len(live) == len(results):
+            return entry
+        self._size -= len(results) - len(live)
+        if not live:
+            del self._scopes[scope]
+            return None
+        entry = (vectors[live], [results[i] for i in live])
+        self._scopes[scope] = entry
+        return entry
+    
+    def _evict(self):
+        """Drop the oldest rows of the least recently used scopes down to maxsize."""
+        while self._size > self.maxsize:
+            scope, (vectors, results) = next(iter(self._scopes.items()))
+            excess = self._size - self.maxsize
+            if excess >= len(results):
+                del self._scopes[scope]
+                self._size -= len(results)
+            else:
+                # Rows are appended in insertion order, so the head is the oldest
+                self._scopes[scope] = (vectors[excess:], results[excess:])
+                self._size -= excess
+    
+    def get(self, scope: Tuple, query_vector: np.ndarray) -> Optional[Any]:
+        self._sync_generation()
+        entry = self._drop_expired(scope, time.monotonic())
+        if entry is None:
+            return None
+        vectors, results = entry
+        similarities = vectors @ query_vector
+        best = int(similarities.argmax())
+        if similarities[best] < self.threshold:
+            return None
+        self._scopes.move_to_end(scope)
+        return results[best][1]
+    
+    def put(self, scope: Tuple, query_vector: np.ndarray, result: Any, generation: int):
+        self._sync_generation()
+        if generation != self._generation:
+            return
+        now = time.monotonic()
+        entry = self._drop_expired(scope, now)
+        expires_at = now + self.exact_cache.ttl
+        if entry is None:
+            self._scopes[scope] = (query_vector[np.newaxis, :], [(expires_at, result)])
+        else:
+            vectors, results = entry
+            results.append((expires_at, result))
+            self._scopes[scope] = (np.vstack((vectors, query_vector)), results)
+            self._scopes.move_to_end(scope)
+        self._size += 1
+        self._evict()
+
+semantic_search_cache = SemanticSearchCache(search_cache, SEMANTIC_CACHE_SIZE, SEMANTIC_CACHE_THRESHOLD)
+
+def canonical_json(obj: Any):
+    """Key-sorted JSON encoding of filters/metadata for cache and batch keys."""
+    return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS, default=str)
+
+# Searches currently running against Mem0, keyed by (cache key, generation)
+inflight_searches: Dict[Tuple, "asyncio.Task"] = {}
+
+def finish_search(inflight_key: Tuple, task: "asyncio.Task", query_vector: Optional[np.ndarray] = None):
+    """Done-callback of a shared search: unregister it and cache its result."""
+    del inflight_searches[inflight_key]
+    if task.cancelled() or task.exception() is not None:
+        return
+    cache_key, generation = inflight_key
+    search_cache.put(cache_key, task.result(), generation)
+    if query_vector is not None:
+        semantic_search_cache.put(cache_key[1:], query_vector, task.result(), generation)
+
+def search_cache_key(request: SearchMemoryRequest) -> Tuple:
+    """Cache key covering every field that affects the search result."""
+    filters = canonical_json(request.filters) if request.filters else None
+    return (request.query, request.user_id, request.agent_id, request.run_id, request.limit, filters)
+
 # Endpoints
 
 @app.get("/")
@@ -235,8 +624,129 @@ def health_check():
             "message": "Mem0 is initializing..."
         }
 
+# ============= Add Request Micro-batching =============
+
+class AddRequestBatcher:
+    """
+    Coalesces concurrent /memories POSTs into one m.add call, i.e. one
+    fact-extraction LLM round-trip.
+    
+    Only requests with the same batch key (user/agent/run, language and
+    metadata) are merged, so memories are never attributed to another owner.
+    The first request for a key opens a batch and schedules its flush after
+    `window` seconds, or earlier once `max_size` requests have joined. Every
+    request in the batch receives the combined m.add result. The flush runs as
+    its own task, so a disconnecting client doesn't cancel the others.
+    """
+    
+    def __init__(self, window: float, max_size: int):
+        self.window = window
+        self.max_size = max_size
+        self._pending: Dict[Tuple, Dict[str, Any]] = {}
+        # Strong references to running flushes; the event loop only keeps weak
+        # ones, and a collected flush would leave its waiters pending forever
+        self._flushes: Set["asyncio.Task"] = set()
+    
+    async def submit(self, key: Tuple, messages: List[Dict[str, str]], **add_kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        
+        batch = self._pending.get(key)
+        if batch is None:
+            batch = {"items": [], "full": asyncio.Event(), "add_kwargs": add_kwargs}
+            self._pending[key] = batch
+            task = loop.create_task(self._flush(key, batch))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+        
+        batch["items"].append((messages, future))
+        if len(batch["items"]) >= self.max_size:
+            # Closed to new requests; the next one opens a fresh batch
+            del self._pending[key]
+            batch["full"].set()
+        
+        return await future
+    
+    async def _flush(self, key: Tuple, batch: Dict[str, Any]):
+        try:
+            await asyncio.wait_for(batch["full"].wait(), self.window)
+        except asyncio.TimeoutError:
+            pass
+        if self._pending.get(key) is batch:
+            del self._pending[key]
+        
+        items = batch["items"]
+        merged_messages = [msg for messages, _ in items for msg in messages]
+        try:
+            result = await add_to_mem0(merged_messages, **batch["add_kwargs"])
+        except Exception as e:
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for _, future in items:
+                if not future.done():
+                    future.set_result(result)
+
+add_batcher = AddRequestBatcher(ADD_BATCH_WINDOW_MS / 1000, ADD_BATCH_MAX_SIZE)
+
+def add_batch_key(request: "AddMemoryRequest", detected_lang: str) -> Tuple:
+    """Batch key: requests may only be merged when all of these agree."""
+    metadata = canonical_json(request.metadata) if request.metadata else None
+    return (request.user_id, request.agent_id, request.run_id, detected_lang, metadata)
+
+def build_enhanced_messages(messages: List[Dict[str, str]], detected_lang: str) -> List[Dict[str, Any]]:
+    """
+    Create enhanced messages with language-aware instructions: the system
+    prompt is injected into the first message as a user message to influence
+    fact extraction; remaining messages are passed as-is.
+    """
+    enhanced_messages = []
+    
+    # For the first message, prepend the language instruction
+    if messages:
+        first_msg = messages[0]
+        enhanced_content = get_enhanced_prompt_prefix(detected_lang) + first_msg["content"]
+        enhanced_messages.append({
+            "role": "user",
+            "content": enhanced_content
+        })
+        
+        # Add remaining messages as-is
+        enhanced_messages.extend(messages[1:])
+    
+    return enhanced_messages
+
+async def add_to_mem0(
+    messages: List[Dict[str, str]],
+    detected_lang: str,
+    user_id: Optional[str],
+    agent_id: Optional[str],
+    run_id: Optional[str],
+    metadata: Optional[Dict[str, Any]]
+) -> Any:
+    """Run m.add for the given messages in a worker thread."""
+    search_cache.invalidate()
+    result = await asyncio.to_thread(
+        m.add,
+        messages=build_enhanced_messages(messages, detected_lang),
+        user_id=user_id,
+        agent_id=agent_id,
+        run_id=run_id,
+        metadata={
+            **(metadata or {}),
+            "detected_language": detected_lang
+        }
+    )
+    search_cache.invalidate()
+    return result
+
+# Endpoints calling into Mem0 are async and run the blocking client calls
+# (LLM + embedding + Qdrant round-trips) via asyncio.to_thread, so slow
+# requests don't hold the event loop.
+
 @app.post("/memories", status_code=201)
-def add_memory(request: AddMemoryRequest):
+async def add_memory(request: AddMemoryRequest):
     """
     Add a new memory with auto-detected language support.
     The system detects the input language and generates facts in the same language.
@@ -245,86 +755,100 @@ def add_memory(request: AddMemoryRequest):
         raise HTTPException(status_code=503, detail="Mem0 not initialized")
     
     try:
-        # Detect language from messages
-        combined_text = " ".join([msg.content for msg in request.messages])
-        detected_lang = detect_language(combined_text) if not request.language else request.language
-        system_prompt = get_system_prompt(detected_lang)
+        # An explicit language skips detection; otherwise detect from the leading messages
+        detected_lang = request.language or detect_language_from_messages(request.messages)
         
-        # Create enhanced messages with language-aware instructions
-        # Inject the system prompt as a user message to influence fact extraction
-        enhanced_messages = []
+        add_kwargs = {
+            "detected_lang": detected_lang,
+            "user_id": request.user_id,
+            "agent_id": request.agent_id,
+            "run_id": request.run_id,
+            "metadata": request.metadata
+        }
         
-        # For the first message, prepend the language instruction
-        if request.messages:
-            first_msg = request.messages[0]
-            enhanced_content = f"{system_prompt}\n\n[用户输入]\n{first_msg.content}" if detected_lang == 'zh' else f"{system_prompt}\n\n[User Input]\n{first_msg.content}"
-            enhanced_messages.append({
-                "role": "user",
-                "content": enhanced_content
-            })
-            
-            # Add remaining messages as-is
-            for msg in request.messages[1:]:
-                enhanced_messages.append(msg.model_dump())
+        batch_key = add_batch_key(request, detected_lang)
+        replay_key = batch_key + tuple((msg.role, msg.content) for msg in request.messages)
+        replayed = add_replay_cache.get(replay_key)
+        if replayed is not None:
+            return replayed
+        generation = add_replay_cache.generation
         
         # Use global Mem0 instance with enhanced messages
-        result = m.add(
-            messages=enhanced_messages,
-            user_id=request.user_id,
-            agent_id=request.agent_id,
-            run_id=request.run_id,
-            metadata={
-                **(request.metadata or {}),
-                "detected_language": detected_lang
-            }
-        )
+        if ADD_BATCH_WINDOW_MS > 0:
+            result = await add_batcher.submit(batch_key, request.messages_as_dicts, **add_kwargs)
+        else:
+            result = await add_to_mem0(request.messages_as_dicts, **add_kwargs)
+        add_replay_cache.put(replay_key, result, generation)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/memories/search")
-def search_memory(request: SearchMemoryRequest):
+async def search_memory(request: SearchMemoryRequest):
     """
     Search for memories.
     """
     if m is None:
         raise HTTPException(status_code=503, detail="Mem0 not initialized")
     
-    try:
-        result = m.search(
+    cache_key = search_cache_key(request)
+    cached = search_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
+    # Identical concurrent searches on a cache miss share one m.search call
+    generation = search_cache.generation
+    inflight_key = (cache_key, generation)
+    task = inflight_searches.get(inflight_key)
+    query_vector = None
+    if task is None and semantic_search_cache.enabled:
+        try:
+            embedding = await asyncio.to_thread(m.embedding_model.embed, request.query, "search")
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        query_vector = SemanticSearchCache.normalize(embedding)
+        cached = semantic_search_cache.get(cache_key[1:], query_vector)
+        if cached is not None:
+            return cached
+        task = inflight_searches.get(inflight_key)
+    if task is None:
+        task = asyncio.create_task(asyncio.to_thread(
+            m.search,
             query=request.query,
             user_id=request.user_id,
             agent_id=request.agent_id,
             run_id=request.run_id,
             limit=request.limit,
             filters=request.filters
-        )
-        return result
+        ))
+        inflight_searches[inflight_key] = task
+        task.add_done_callback(functools.partial(finish_search, inflight_key, query_vector=query_vector))
+    
+    try:
+        # Shielded, so a disconnecting client doesn't cancel the shared search
+        return await asyncio.shield(task)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/memories")
-def get_all_memories(user_id: Optional[str] = None, limit: int = 100):
+async def get_all_memories(user_id: Optional[str] = None, limit: int = 100):
     """
-    Get all memories (simplified wrapper around get_all if available or search).
-    Mem0 'get_all' might be 'get_all(user_id=...)'.
+    Get all memories (simplified wrapper around get_all).
+    Returns 501 if the Mem0 client has no get_all.
     """
     if m is None:
         raise HTTPException(status_code=503, detail="Mem0 not initialized")
     
+    if not _HAS_GET_ALL:
+        raise HTTPException(status_code=501, detail="Mem0 client does not support get_all")
+    
     try:
-        # Check if get_all exists, otherwise use search with empty query or similar
-        if hasattr(m, 'get_all'):
-            return m.get_all(user_id=user_id, limit=limit)
-        else:
-            # Fallback to search if get_all is not directly exposed or different signature
-            # But usually m.get_all() is available
-            return m.get_all(user_id=user_id)
+        return await asyncio.to_thread(m.get_all, user_id=user_id, limit=limit)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.delete("/memories/{memory_id}")
-def delete_memory(memory_id: str):
+async def delete_memory(memory_id: str):
     """
     Delete a memory by ID.
     """
@@ -332,13 +856,16 @@ def delete_memory(memory_id: str):
         raise HTTPException(status_code=503, detail="Mem0 not initialized")
     
     try:
-        m.delete(memory_id)
+        search_cache.invalidate()
+        await asyncio.to_thread(m.delete, memory_id)
+        search_cache.invalidate()
+        add_replay_cache.invalidate()
         return {"status": "success", "message": f"Memory {memory_id} deleted"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.delete("/memories")
-def delete_all_memories(user_id: str):
+async def delete_all_memories(user_id: str):
     """
     Delete all memories for a user.
     """
@@ -346,42 +873,73 @@ def delete_all_memories(user_id: str):
         raise HTTPException(status_code=503, detail="Mem0 not initialized")
     
     try:
-        m.reset(user_id=user_id)
+        search_cache.invalidate()
+        await asyncio.to_thread(m.reset, user_id=user_id)
+        search_cache.invalidate()
+        add_replay_cache.invalidate()
         return {"status": "success", "message": f"All memories for user {user_id} deleted"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/admin/reset-collections")
-def reset_qdrant_collections():
+async def reset_qdrant_collections():
     """
     Admin endpoint to reset/clear all Qdrant collections.
     Use this when changing embedding model dimensions to clear incompatible vectors.
+    Collections are deleted concurrently; failures are reported per collection.
     """
     try:
-        from qdrant_client import QdrantClient
+        from qdrant_client import AsyncQdrantClient
         
         qdrant_host = os.getenv("QDRANT_HOST", "localhost")
         qdrant_port = int(os.getenv("QDRANT_PORT", "6333"))
         
-        client = QdrantClient(host=qdrant_host, port=qdrant_port)
-        collections = client.get_collections()
+        client = AsyncQdrantClient(host=qdrant_host, port=qdrant_port)
+        try:
+            collections = (await client.get_collections()).collections
+            results = await asyncio.gather(
+                *(client.delete_collection(collection.name) for collection in collections),
+                return_exceptions=True
+            )
+        finally:
+            await client.close()
         
         deleted_collections = []
-        for collection in collections.collections:
-            try:
-                client.delete_collection(collection.name)
+        failed_collections = {}
+        for collection, result in zip(collections, results):
+            if isinstance(result, Exception):
+                logger.error(f"Failed to delete collection {collection.name}: {result}")
+                failed_collections[collection.name] = str(result)
+            else:
                 deleted_collections.append(collection.name)
-            except Exception as e:
-                print(f"Failed to delete collection {collection.name}: {e}")
+        search_cache.invalidate()
+        add_replay_cache.invalidate()
         
         return {
             "status": "success",
             "message": f"Reset {len(deleted_collections)} Qdrant collections",
-            "deleted_collections": deleted_collections
+            "deleted_collections": deleted_collections,
+            "failed_collections": failed_collections
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to reset collections: {str(e)}")
 
+@app.post("/admin/optimize-collection")
+async def optimize_qdrant_collection(collection_name: Optional[str] = None):
+    """
+    Admin endpoint to enable int8 scalar quantization (with on-disk original
+    vectors and HNSW graph) on the Mem0 Qdrant collection, or on the given one.
+    """
+    try:
+        collection_name = await asyncio.to_thread(quantize_qdrant_collection, collection_name)
+        return {
+            "status": "success",
+            "message": f"Enabled int8 quantization for Qdrant collection {collection_name}",
+            "collection": collection_name
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to optimize collection: {str(e)}")
+
 # ============= Memory Maintenance Service =============
 
 from memory_maintenance import MemoryMaintenanceService, MaintenanceConfig
@@ -389,7 +947,6 @@ from memory_maintenance import MemoryMaintenanceService, MaintenanceConfig
 # Global maintenance service instance
 maintenance_service = None
 
-@app.on_event("startup")
 async def startup_maintenance():
     """初始化维护服务"""
     global maintenance_service
@@ -399,7 +956,7 @@ async def startup_maintenance():
         decay_alpha=100.0  # 闪电模式：12分钟内达到存档状态
     )
     maintenance_service = MemoryMaintenanceService(config)
-    print("✓ Memory maintenance service initialized (Lightning Mode: alpha=100.0)")
+    logger.info("✓ Memory maintenance service initialized (Lightning Mode: alpha=100.0)")
 
 @app.post("/admin/maintenance/run")
 async def trigger_maintenance():
@@ -437,4 +994,12 @@ async def get_maintenance_config():
     }
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Each worker is a separate process with its own Mem0 client, search
+    # cache, batcher and maintenance service, so WEB_CONCURRENCY defaults to 1.
+    # uvloop/httptools come with uvicorn[standard] and are picked automatically.
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=int(os.getenv("WEB_CONCURRENCY", "1"))
+    )
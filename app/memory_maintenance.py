@@ -132,6 +132,12 @@ class MemorySummarizer:
     def __init__(self, api_key: str):
         self.api_key = api_key
         self.api_url = "https://open.bigmodel.cn/api/paas/v4/chat/completions"
+        # 复用连接（keep-alive），避免每次摘要都重新建立TCP+TLS连接
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        })
     
     def summarize(self, original_content: str, target_level: str) -> str:
         """
@@ -197,12 +203,8 @@ class MemorySummarizer:
 直接返回存档标记，不要解释。"""
         
         try:
-            response = requests.post(
+            response = self.session.post(
                 self.api_url,
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                },
                 json={
                     "model": "glm-4-flash",
                     "messages": [{"role": "user", "content": prompt}],
@@ -229,6 +231,8 @@ class MemoryMaintenanceService:
         self.config = config
         self.decay_calculator = MemoryDecayCalculator(config.decay_alpha)
         self.summarizer = MemorySummarizer(config.zhipu_api_key)
+        # 与Mem0服务之间的连接池（keep-alive）
+        self.session = requests.Session()
         self.stats = {
             "total_scanned": 0,
             "total_updated": 0,
@@ -260,7 +264,7 @@ class MemoryMaintenanceService:
     def get_user_memories(self, user_id: str) -> List[Dict[str, Any]]:
         """获取用户所有记忆"""
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.config.mem0_url}/memories",
                 params={"user_id": user_id},
                 timeout=30
@@ -284,7 +288,7 @@ class MemoryMaintenanceService:
         """
         try:
             # 方案1: 如果Mem0支持PATCH/PUT，直接更新
-            # response = requests.put(
+            # response = self.session.put(
             #     f"{self.config.mem0_url}/memories/{memory_id}",
             #     json={"content": new_content, "metadata": new_metadata}
             # )
@@ -302,7 +306,7 @@ class MemoryMaintenanceService:
     def delete_memory(self, memory_id: str) -> bool:
         """删除记忆"""
         try:
-            response = requests.delete(
+            response = self.session.delete(
                 f"{self.config.mem0_url}/memories/{memory_id}",
                 timeout=30
             )
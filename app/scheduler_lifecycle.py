@@ -15,11 +15,13 @@ import asyncio
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional, Set
 from dataclasses import dataclass, field
+import hashlib
 import logging
 import json
+import os
 
 from complete_memory_system import (
-    Memory, MemoryStore, MemoryLevel, MemoryCategory
+    Memory, MemoryStore, MemoryLevel, MemoryCategory, round_weight_log_entry
 )
 from complete_memory_engine import (
     CompleteMemoryEngine, UpdateTrigger
@@ -53,6 +55,10 @@ class SchedulerConfig:
     # 性能优化
     enable_parallel: bool = True
     max_workers: int = 4
+    
+    # 衰减扫描快照（大规模部署：落盘memmap并分块扫描）
+    snapshot_mmap_dir: Optional[str] = None
+    snapshot_chunk_size: int = 65536
 
 
 # ============================================================================
@@ -140,12 +146,20 @@ class MetricsCollector:
             count = sum(1 for m in all_memories if m.metadata.category == category)
             category_dist[category.value] = count
         
-        # 权重统计
+        # 权重统计（冻结记忆不衰减，沿用当前权重）
         weights = []
+        decaying_memories = []
         for memory in all_memories:
-            if not memory.metadata.is_deleted:
-                factors = engine.calculate_enhanced_weight(memory)
-                weights.append(factors.total_weight)
+            if memory.metadata.is_deleted:
+                continue
+            if memory.metadata.is_frozen:
+                weights.append(memory.metadata.factors.total_weight)
+            else:
+                decaying_memories.append(memory)
+        
+        weights.extend(engine.calculate_enhanced_weights(
+            store.snapshot_arrays(decaying_memories)
+        )["total_weight"].tolist())
         
         snapshot = MetricsSnapshot(
             timestamp=datetime.now().isoformat(),
@@ -249,43 +263,38 @@ class MemoryScheduler:
         """压缩用户记忆"""
         
         memories = self.store.get_user_memories(user_id)
-        now = datetime.now()
+        if not memories:
+            return
         
-        for memory in memories:
-            # 跳过冻结/删除/敏感
-            if memory.metadata.is_frozen:
-                continue
-            if memory.metadata.is_deleted:
-                continue
-            if memory.metadata.is_sensitive and memory.metadata.sensitivity_level >= 3:
-                continue
-            
-            # 计算当前权重
-            old_factors = memory.metadata.factors
-            old_weight = old_factors.total_weight
-            
-            new_factors = self.engine.calculate_enhanced_weight(
-                memory,
-                UpdateTrigger.PASSIVE_DECAY,
-                now
-            )
-            new_weight = new_factors.total_weight
+        # 批量计算权重与目标层级（冻结/删除/敏感记忆在批处理中被排除）
+        # 每个用户一个快照子目录，目录名取 user_id 的哈希，避免路径穿越与非法字符
+        mmap_dir = self.config.snapshot_mmap_dir
+        if mmap_dir is not None:
+            mmap_dir = os.path.join(mmap_dir, hashlib.blake2b(user_id.encode('utf-8'), digest_size=16).hexdigest())
+        
+        changed, new_levels, weights = self.engine.batch_passive_decay(
+            self.store.snapshot_arrays(memories, mmap_dir=mmap_dir, chunk_size=self.config.snapshot_chunk_size),
+            datetime.now(),
+            chunk_size=self.config.snapshot_chunk_size
+        )
+        
+        # 仅对层级变化的记忆生成因子对象并执行压缩
+        # old_weight 取最近一次物化的 factors.total_weight，与引擎其余路径一致
+        all_levels = tuple(MemoryLevel)
+        for i, level_idx in zip(changed.tolist(), new_levels.tolist()):
+            memory = memories[i]
+            old_weight = memory.metadata.factors.total_weight
+            new_factors = self.engine.factors_at(weights, i)
             
-            # 更新因子
             memory.metadata.factors = new_factors
-            
-            # 决定是否压缩
-            new_level = self.engine.decide_compression_level(
-                new_weight,
-                memory.metadata.is_frozen,
-                memory.metadata.is_sensitive,
-                memory.metadata.sensitivity_level
+            self._compress_memory(
+                memory,
+                all_levels[level_idx],
+                old_weight,
+                new_factors.total_weight,
+                new_factors
             )
-            
-            if new_level != memory.metadata.level:
-                # 执行压缩
-                self._compress_memory(memory, new_level, old_weight, new_weight, new_factors)
-                self.metrics.increment_operation("compression")
+            self.metrics.increment_operation("compression")
     
     def _compress_memory(
         self,
@@ -359,15 +368,10 @@ class MemoryScheduler:
         category_groups: Dict[MemoryCategory, List[Memory]] = {}
         
         for memory in memories:
-            if memory.metadata.is_deleted:
-                continue
             if memory.metadata.is_frozen:
                 continue
             
-            category = memory.metadata.category
-            if category not in category_groups:
-                category_groups[category] = []
-            category_groups[category].append(memory)
+            category_groups.setdefault(memory.metadata.category, []).append(memory)
         
         # 对每个类别，查找相似记忆并合并
         for category, group_memories in category_groups.items():
@@ -465,7 +469,7 @@ class MemoryScheduler:
     async def _cleanup_user_memories(self, user_id: str):
         """清理用户记忆"""
         
-        memories = self.store.get_user_memories(user_id)
+        memories = self.store.get_user_memories(user_id, include_deleted=True)
         now = datetime.now()
         
         to_delete = []
@@ -488,8 +492,7 @@ class MemoryScheduler:
             factors = self.engine.calculate_enhanced_weight(memory, now=now)
             
             if factors.total_weight < self.config.cleanup_weight_threshold:
-                created_time = datetime.fromisoformat(memory.metadata.created_at)
-                days_old = (now - created_time).days
+                days_old = int((now.timestamp() - memory.metadata._created_ts) // 86400)
                 
                 if days_old >= self.config.cleanup_days_threshold:
                     to_delete.append(memory.memory_id)
@@ -616,7 +619,7 @@ class LifecycleManager:
         if not memory:
             return []
         
-        return memory.metadata.weight_change_log
+        return [round_weight_log_entry(entry) for entry in memory.metadata.weight_change_log]
     
     def get_compression_history(self, memory_id: str) -> List[Dict]:
         """获取压缩历史"""
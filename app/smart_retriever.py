@@ -137,8 +137,7 @@ class SmartRetriever:
         if now is None:
             now = datetime.now()
         
-        last_active = datetime.fromisoformat(memory.metadata.last_activated_at)
-        delta_seconds = (now - last_active).total_seconds()
+        delta_seconds = now.timestamp() - memory.metadata._last_act_ts
         delta_days = delta_seconds / self.engine.time_scale
         
         # 时间衰减
@@ -10,6 +10,7 @@
 5. 定时调度服务 ✓
 6. 生命周期管理 ✓
 7. 特殊情形处理 ✓
+8. 批量权重计算 ✓
 
 运行方式：
   uv run python tests/test_complete_simulation.py
@@ -588,6 +589,62 @@ class CompleteMemorySystemSimulation:
         except Exception as e:
             self.log_test_result("特殊情形处理", False, f"异常: {e}")
     
+    def test_8_batch_weights(self):
+        """测试8: 批量权重计算"""
+        
+        print("\n" + "="*70)
+        print("📋 测试8: 批量权重计算（被动衰减扫描）")
+        print("="*70)
+        
+        try:
+            now = datetime.now()
+            memories = []
+            for i, category in enumerate(MemoryCategory):
+                mid = self.id_generator.generate_memory_id(self.user_identity.user_id)
+                past = now - timedelta(minutes=i * 3)
+                m = MemoryMetadata(
+                    memory_id=mid,
+                    device_uuid=self.device_manager.get_device_id(),
+                    user_id=self.user_identity.user_id,
+                    created_at=past.isoformat(),
+                    last_activated_at=past.isoformat(),
+                    category=category,
+                    last_mention_time=past.isoformat() if i % 2 else None,
+                    recent_mentions=[
+                        (now - timedelta(hours=h)).isoformat() for h in range(0, 30, 6)
+                    ][:i],
+                    is_negated=(i == 3),
+                    correction_history=[{"timestamp": past.isoformat()}] if i == 3 else []
+                )
+                memories.append(Memory(
+                    memory_id=mid,
+                    content=MultimodalContent(text=f"批量测试 {i}"),
+                    metadata=m
+                ))
+            
+            batch = self.engine.calculate_enhanced_weights(
+                self.store.snapshot_arrays(memories),
+                now
+            )
+            
+            max_diff = 0.0
+            for i, memory in enumerate(memories):
+                scalar = self.engine.calculate_enhanced_weight(memory, now=now)
+                max_diff = max(max_diff, abs(scalar.total_weight - batch["total_weight"][i]))
+            
+            print(f"  记忆数: {len(memories)}")
+            print(f"  批量与逐条最大误差: {max_diff:.2e}")
+            assert max_diff < 1e-9, "批量结果应与逐条计算一致"
+            
+            self.log_test_result(
+                "批量权重计算",
+                True,
+                "向量化结果与逐条计算一致"
+            )
+            
+        except Exception as e:
+            self.log_test_result("批量权重计算", False, f"异常: {e}")
+    
     async def run_all_tests(self):
         """运行所有测试"""
         
@@ -601,6 +658,7 @@ class CompleteMemorySystemSimulation:
         await self.test_5_scheduler()
         self.test_6_lifecycle_management()
         self.test_7_special_scenarios()
+        self.test_8_batch_weights()
         
         # 统计结果
         print("\n" + "="*70)
@@ -630,6 +688,7 @@ class CompleteMemorySystemSimulation:
             print("   ✓ 定时调度服务")
             print("   ✓ 生命周期管理")
             print("   ✓ 特殊情形处理")
+            print("   ✓ 批量权重计算")
             print("\n📄 详细方案文档: COMPLETE_MEMORY_SOLUTION.md")
         else:
             print(f"\n⚠️ 有 {total - passed} 个测试失败，请检查")
@@ -10,6 +10,7 @@
 5. 定时调度服务
 6. 生命周期管理
 7. 特殊情形处理
+8. 修正记录与时间缓存
 """
 
 import asyncio
@@ -476,6 +477,56 @@ class CompleteMemorySystemTest:
         
         print("\n✓ 特殊情形处理测试通过")
     
+    def test_8_correction_cache(self):
+        """测试8: 修正记录与时间缓存"""
+        
+        print("\n" + "="*60)
+        print("测试8: 修正记录与时间缓存")
+        print("="*60)
+        
+        now = datetime.now()
+        memory_id = self.id_generator.generate_memory_id(self.user_identity.user_id)
+        metadata = MemoryMetadata(
+            memory_id=memory_id,
+            device_uuid=self.device_manager.get_device_id(),
+            user_id=self.user_identity.user_id,
+            created_at=now.isoformat(),
+            last_activated_at=now.isoformat(),
+            category=MemoryCategory.STABLE_PREFERENCE
+        )
+        memory = Memory(
+            memory_id=memory_id,
+            content=MultimodalContent(text="我住在上海"),
+            metadata=metadata
+        )
+        assert metadata._last_correction_ts is None
+        
+        # 原地追加修正记录并同步缓存
+        first = now - timedelta(days=2)
+        metadata.record_correction(first.isoformat(), reason="用户纠正")
+        print(f"  修正记录: {len(metadata.correction_history)} 条")
+        assert metadata.correction_history[-1] == {
+            "timestamp": first.isoformat(), "reason": "用户纠正"
+        }
+        assert metadata._last_correction_ts == first.timestamp()
+        
+        # 缓存始终指向最近追加的一条
+        second = now - timedelta(days=1)
+        metadata.record_correction(second.isoformat())
+        assert len(metadata.correction_history) == 2
+        assert metadata._last_correction_ts == second.timestamp()
+        
+        # 否定惩罚按缓存的修正时间计算，与整体赋值 correction_history 的结果一致
+        metadata.is_negated = True
+        factors_recorded = self.engine.calculate_enhanced_weight(memory, now=now)
+        metadata.correction_history = [{"timestamp": second.isoformat()}]
+        factors_assigned = self.engine.calculate_enhanced_weight(memory, now=now)
+        print(f"  否定惩罚 C: {factors_recorded.conflict_penalty:.4f}")
+        assert factors_recorded.conflict_penalty == factors_assigned.conflict_penalty
+        assert factors_recorded.conflict_penalty < 1.0
+        
+        print("\n✓ 修正记录与时间缓存测试通过")
+    
     async def run_all_tests(self):
         """运行所有测试"""
         
@@ -490,6 +541,7 @@ class CompleteMemorySystemTest:
         await self.test_5_scheduler()
         self.test_6_lifecycle_management()
         self.test_7_special_scenarios()
+        self.test_8_correction_cache()
         
         print("\n" + "="*60)
         print("✓ 所有测试通过！")
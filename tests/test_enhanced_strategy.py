@@ -8,6 +8,8 @@
 3. 跨模态更新
 4. 批量合并
 5. 权重动态计算
+6. 批量权重计算
+7. 修正记录与权重缓存失效
 """
 
 import sys
@@ -348,6 +350,91 @@ def test_decision_scenarios():
     print("\n✅ 验证：不同场景的决策逻辑正确")
 
 
+def test_batch_weight():
+    """测试批量权重计算与逐条计算一致"""
+    print_section("测试10：批量权重计算")
+    
+    strategy = EnhancedMemoryStrategy(user_factor=1.2)
+    now = datetime(2024, 1, 31, 10, 0, 0)
+    
+    def build():
+        return [
+            MemoryMetadata(
+                created_at="2024-01-01T10:00:00",
+                last_activated_at="2024-01-01T10:00:00",
+                category=MemoryCategory.TEMPORARY
+            ),
+            MemoryMetadata(
+                created_at="2024-01-01T10:00:00",
+                last_activated_at="2024-01-20T10:00:00",
+                last_mention_time="2024-01-30T10:00:00",
+                category=MemoryCategory.STABLE_PREFERENCE,
+                recent_mentions=["2024-01-20T10:00:00", "2024-01-29T10:00:00", "2024-01-30T10:00:00"]
+            ),
+            MemoryMetadata(
+                created_at="2024-01-01T10:00:00",
+                last_activated_at="2024-01-01T10:00:00",
+                category=MemoryCategory.SHORT_PREFERENCE,
+                is_negated=True,
+                correction_history=[{"time": "2024-01-15T10:00:00"}]
+            ),
+            MemoryMetadata(
+                created_at="2024-01-01T10:00:00",
+                last_activated_at="2024-01-10T10:00:00",
+                category=MemoryCategory.IDENTITY,
+                is_negated=True
+            ),
+        ]
+    
+    scalar = [strategy.calculate_enhanced_weight(m, now) for m in build()]
+    batch = strategy.calculate_enhanced_weight_batch(build(), now)
+    
+    for i, (w_scalar, w_batch) in enumerate(zip(scalar, batch)):
+        print(f"记忆{i + 1}: 逐条={w_scalar:.6f}  批量={w_batch:.6f}")
+        assert abs(w_scalar - w_batch) < 1e-9
+    
+    print("\n✅ 验证：批量结果与逐条计算一致")
+
+
+def test_correction_cache():
+    """测试 record_correction 使权重缓存失效"""
+    print_section("测试11：修正记录与权重缓存")
+    
+    strategy = EnhancedMemoryStrategy(user_factor=1.0)
+    now = datetime(2024, 1, 31, 10, 0, 0)
+    
+    def build():
+        return MemoryMetadata(
+            created_at="2024-01-01T10:00:00",
+            last_activated_at="2024-01-01T10:00:00",
+            category=MemoryCategory.SHORT_PREFERENCE,
+            is_negated=True
+        )
+    
+    metadata = build()
+    metadata.record_correction("2024-01-15T10:00:00", reason="用户否定")
+    w_before = strategy.calculate_enhanced_weight(metadata, now)
+    assert not metadata._dirty
+    assert strategy.calculate_enhanced_weight(metadata, now) == w_before
+    
+    # 同一天内追加更近的否定：缓存必须失效，按新否定时间重算
+    metadata.record_correction("2024-01-30T10:00:00")
+    assert metadata._dirty
+    assert metadata.correction_history[-1] == {"time": "2024-01-30T10:00:00"}
+    w_after = strategy.calculate_enhanced_weight(metadata, now)
+    
+    expected = build()
+    expected.correction_history = [{"time": "2024-01-30T10:00:00"}]
+    w_expected = strategy.calculate_enhanced_weight(expected, now)
+    
+    print(f"第15天否定后权重: {w_before:.4f}")
+    print(f"第30天再次否定后权重: {w_after:.4f}")
+    assert w_after != w_before
+    assert abs(w_after - w_expected) < 1e-12
+    
+    print("\n✅ 验证：修正记录写入后权重按最新否定时间重算")
+
+
 def main():
     """运行所有测试"""
     print("\n" + "="*70)
@@ -363,6 +450,8 @@ def main():
     test_negation_scenario()
     test_batch_merge()
     test_decision_scenarios()
+    test_batch_weight()
+    test_correction_cache()
     
     print_section("✅ 所有测试完成")
     
@@ -376,6 +465,8 @@ def main():
     print("  7. 否定/修正处理 ✅")
     print("  8. 批量合并 ✅")
     print("  9. 决策场景矩阵 ✅")
+    print("  10. 批量权重计算 ✅")
+    print("  11. 修正记录与权重缓存 ✅")
     print()
     print("增强公式: W(t) = w_time(t) * S(t) * C(t) * I * U * M(t)")
     print()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+语义搜索缓存测试
+
+测试场景：
+1. 单一作用域条目超过容量时只淘汰最旧条目
+2. 多作用域时优先淘汰最久未使用作用域
+3. 过期的最佳匹配不遮挡有效的次佳匹配，且过期行被清理
+4. search_cache 失效后整体清空
+
+运行方式：
+  uv run python tests/test_semantic_cache.py
+"""
+
+import sys
+import os
+
+# 添加app目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+from main import SearchResultCache, SemanticSearchCache
+
+
+def unit(*values):
+    return SemanticSearchCache.normalize(values)
+
+
+def make_cache(maxsize=3, threshold=0.9):
+    exact_cache = SearchResultCache(16, 60)
+    return SemanticSearchCache(exact_cache, maxsize, threshold)
+
+
+def test_1_single_scope_overflow():
+    """单一作用域超出容量：保留最新条目，淘汰最旧条目"""
+    print("\n" + "="*60)
+    print("测试1: 单一作用域溢出")
+    print("="*60)
+
+    cache = make_cache(maxsize=3)
+    scope = ("alice",)
+    vectors = [unit(1, 0, 0, 0), unit(0, 1, 0, 0), unit(0, 0, 1, 0), unit(0, 0, 0, 1)]
+    for i, vector in enumerate(vectors):
+        cache.put(scope, vector, f"r{i}", cache._generation)
+
+    print(f"  条目数: {cache._size}")
+    assert cache._size == 3
+    assert cache.get(scope, vectors[0]) is None, "最旧条目应被淘汰"
+    for i in range(1, 4):
+        assert cache.get(scope, vectors[i]) == f"r{i}"
+
+    print("✓ 单一作用域溢出测试通过")
+
+
+def test_2_lru_scope_eviction():
+    """多作用域：先淘汰最久未使用作用域中的最旧条目"""
+    print("\n" + "="*60)
+    print("测试2: 最久未使用作用域淘汰")
+    print("="*60)
+
+    cache = make_cache(maxsize=3)
+    a, b = unit(1, 0, 0), unit(0, 1, 0)
+    cache.put(("alice",), a, "alice-a", cache._generation)
+    cache.put(("alice",), b, "alice-b", cache._generation)
+    cache.put(("bob",), a, "bob-a", cache._generation)
+    # 访问 alice 使 bob 成为最久未使用
+    assert cache.get(("alice",), a) == "alice-a"
+    cache.put(("carol",), a, "carol-a", cache._generation)
+
+    print(f"  作用域: {list(cache._scopes)}")
+    assert cache._size == 3
+    assert cache.get(("bob",), a) is None
+    assert cache.get(("alice",), a) == "alice-a"
+    assert cache.get(("alice",), b) == "alice-b"
+    assert cache.get(("carol",), a) == "carol-a"
+
+    print("✓ 作用域淘汰测试通过")
+
+
+def test_3_expired_best_match():
+    """过期的最佳匹配不应遮挡有效的次佳匹配"""
+    print("\n" + "="*60)
+    print("测试3: 过期条目清理")
+    print("="*60)
+
+    cache = make_cache(maxsize=8, threshold=0.8)
+    scope = ("alice",)
+    query = unit(1, 0, 0)
+
+    cache.put(scope, unit(1, 0.3, 0), "valid", cache._generation)
+    # 最佳匹配写入即过期
+    cache.exact_cache.ttl = -1
+    cache.put(scope, query, "expired", cache._generation)
+    assert cache._size == 2
+
+    result = cache.get(scope, query)
+    print(f"  命中: {result}, 条目数: {cache._size}")
+    assert result == "valid"
+    assert cache._size == 1
+    vectors, results = cache._scopes[scope]
+    assert vectors.shape[0] == len(results) == 1
+
+    # 作用域全部过期时整体移除
+    cache.exact_cache.ttl = -1
+    cache.put(("bob",), query, "expired", cache._generation)
+    assert cache.get(("bob",), query) is None
+    assert ("bob",) not in cache._scopes
+    assert cache._size == 1
+
+    print("✓ 过期条目清理测试通过")
+
+
+def test_4_generation_invalidation():
+    """search_cache 失效后语义缓存清空，旧代结果不再写入"""
+    print("\n" + "="*60)
+    print("测试4: 代际失效")
+    print("="*60)
+
+    cache = make_cache()
+    scope = ("alice",)
+    query = unit(1, 0, 0)
+    generation = cache._generation
+    cache.put(scope, query, "r0", generation)
+    cache.exact_cache.invalidate()
+
+    assert cache.get(scope, query) is None
+    assert cache._size == 0
+    cache.put(scope, query, "stale", generation)
+    assert cache._size == 0
+
+    print("✓ 代际失效测试通过")
+
+
+def main():
+    test_1_single_scope_overflow()
+    test_2_lru_scope_eviction()
+    test_3_expired_best_match()
+    test_4_generation_invalidation()
+
+    print("\n" + "="*60)
+    print("✓ 所有测试通过！")
+    print("="*60)
+
+
+if __name__ == "__main__":
+    main()